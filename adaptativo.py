@@ -0,0 +1,53 @@
+# adaptativo.py
+import numpy as np
+from typing import Tuple
+
+
+class ControleAdaptativo:
+    """
+    Ajusta a cada geração a taxa de mutação, o tamanho do torneio e a fração de imigrantes
+    aleatórios a partir da diversidade da população.
+
+    Abaixo da `diversidade_alvo` a população está convergindo para clones: a mutação sobe
+    (multiplicada por `fator`), o torneio encolhe (menos pressão seletiva) e parte dos filhos
+    é trocada por permutações aleatórias, proporcionalmente ao déficit. Acima do alvo o
+    movimento é o inverso, devolvendo a pressão seletiva para intensificar a busca.
+    """
+
+    def __init__(self, diversidade_alvo: float = 0.3, fator: float = 1.5,
+                 taxa_minima: float = 0.01, taxa_maxima: float = 0.5,
+                 torneio_minimo: int = 2, torneio_maximo: int = 7,
+                 fracao_imigrantes_maxima: float = 0.2, tamanho_amostra: int = 32):
+        self.diversidade_alvo = diversidade_alvo
+        self.fator = fator
+        self.taxa_minima = taxa_minima
+        self.taxa_maxima = taxa_maxima
+        self.torneio_minimo = torneio_minimo
+        self.torneio_maximo = torneio_maximo
+        self.fracao_imigrantes_maxima = fracao_imigrantes_maxima
+        self.tamanho_amostra = tamanho_amostra
+
+    def medir(self, populacao: np.ndarray, rng: np.random.Generator) -> float:
+        """
+        Distância de Hamming média (normalizada em [0, 1]) entre todos os pares de uma amostra
+        de `tamanho_amostra` indivíduos: O(amostra² * n), independente do tamanho da população.
+        """
+        if len(populacao) > self.tamanho_amostra:
+            populacao = populacao[rng.choice(len(populacao), self.tamanho_amostra, replace=False)]
+        k = len(populacao)
+        if k < 2:
+            return 0.0
+        diferentes = (populacao[:, None, :] != populacao[None, :, :]).mean(axis=2)
+        return float(diferentes.sum() / (k * (k - 1)))  # A diagonal (cada um consigo mesmo) é zero
+
+    def ajustar(self, diversidade: float, taxa_mutacao: float,
+                tamanho_torneio: int) -> Tuple[float, int, float]:
+        """Retorna (taxa_mutacao, tamanho_torneio, fracao_imigrantes) para a próxima geração."""
+        if diversidade < self.diversidade_alvo:
+            taxa_mutacao = min(self.taxa_maxima, taxa_mutacao * self.fator)
+            tamanho_torneio = max(self.torneio_minimo, tamanho_torneio - 1)
+            deficit = (self.diversidade_alvo - diversidade) / self.diversidade_alvo
+            return taxa_mutacao, tamanho_torneio, self.fracao_imigrantes_maxima * deficit
+        taxa_mutacao = max(self.taxa_minima, taxa_mutacao / self.fator)
+        tamanho_torneio = min(self.torneio_maximo, tamanho_torneio + 1)
+        return taxa_mutacao, tamanho_torneio, 0.0
@@ -1,8 +1,23 @@
 # algoritmo_genetico.py
+import heapq
+import math
+import os
+import time
 import numpy as np
-from typing import List
+from typing import List, Tuple
 from pqa import PQA
-from operadores import Selecao, Crossover, Mutacao, Elitismo
+from operadores import Selecao, Crossover, Mutacao, Elitismo, BuscaLocal
+from populacao import Populacao
+from cache import CacheCustos
+from avaliacao import criar_avaliador
+from telemetria import diversidade
+from perfil import Perfil
+from adaptativo import ControleAdaptativo
+import checkpoint
+from exato import chave_instancia
+
+# Trocas aleatórias tentadas em um indivíduo duplicado antes de sorteá-lo de novo
+TENTATIVAS_DUPLICATA = 3
 
 class AlgoritmoGenetico:
     def __init__(self, pqc: PQA, tamanho_populacao: int, max_geracoes: int,
@@ -11,7 +26,99 @@ class AlgoritmoGenetico:
                  metodo_crossover: str = 'ox',
                  metodo_elitismo: str = 'top',
                  metodo_mutacao: str = 'swap',
-                 pmx_retorna_um_filho: bool = False):  # Adicionado
+                 pmx_retorna_um_filho: bool = False,  # Adicionado
+                 rng=None,
+                 paciencia: int = 50,
+                 tempo_limite: float = None,
+                 max_avaliacoes: int = None,
+                 cache=None,
+                 metodo_busca_local: str = None,
+                 fracao_busca_local: float = 0.1,
+                 max_iteracoes_busca_local: int = 50,
+                 tempo_busca_local: float = None,
+                 telemetria=None,
+                 intervalo_impressao: int = 1,
+                 perfil=False,
+                 tamanho_torneio: int = 3,
+                 controle_adaptativo=None,
+                 populacao_unica: bool = False,
+                 caminho_checkpoint: str = None,
+                 intervalo_checkpoint: int = 10,
+                 modelo: str = 'geracional',
+                 filhos_por_passo: int = 2,
+                 limitante: bool = False,
+                 gap_alvo: float = None,
+                 avaliador='serial',
+                 trabalhadores_avaliacao: int = None):
+        """
+        `rng` pode ser um numpy.random.Generator, uma SeedSequence ou um inteiro; todos os
+        operadores sorteiam a partir dele, então duas execuções com a mesma semente são idênticas.
+        Para repetições independentes use os filhos de um gerador: `np.random.default_rng(s).spawn(k)`.
+
+        Critérios de parada além de `max_geracoes` (None desativa cada um):
+          - paciencia: número de gerações seguidas sem melhorar o melhor custo;
+          - tempo_limite: tempo de relógio máximo de `executar`, em segundos;
+          - max_avaliacoes: número máximo de avaliações completas de custo;
+          - gap_alvo: gap de otimalidade (veja abaixo) a partir do qual o resultado basta.
+        O motivo da parada fica em `self.motivo_parada`.
+
+        `cache` ativa o cache de custos na frente de `pqc.calcular_custos`: pode ser o limite
+        de memória em bytes ou uma instância de CacheCustos (para compartilhar entre execuções).
+
+        Modo memético: com `metodo_busca_local` = 'melhor' ou 'primeira', a cada geração a
+        melhor elite e uma fração `fracao_busca_local` dos filhos passam por busca local de
+        troca de pares, limitada a `max_iteracoes_busca_local` trocas por indivíduo e a
+        `tempo_busca_local` segundos por geração.
+
+        `telemetria` recebe um registro por geração (melhor/média/pior custo, diversidade,
+        avaliações e tempo decorrido); veja telemetria.py. `intervalo_impressao` controla a
+        saída no console: imprime a cada N gerações (0 desativa).
+
+        `perfil` ativa a medição de tempo e chamadas por fase da geração (seleção, elitismo,
+        crossover, mutação, reposição, avaliação, busca local, fitness e registro): True ou uma
+        instância de Perfil (para acumular entre execuções). O resultado fica em `self.perfil`
+        e, havendo telemetria, é enviado ao final de `executar` por `registrar_perfil`.
+
+        `controle_adaptativo` (True ou uma instância de ControleAdaptativo) mede a diversidade
+        a cada geração e ajusta `taxa_mutacao`, `tamanho_torneio` e a fração de imigrantes
+        aleatórios; veja adaptativo.py. A última diversidade medida fica em `self.diversidade`.
+
+        Com `populacao_unica`, nenhuma permutação aparece duas vezes na população: cada linha
+        é identificada pelos seus bytes em um conjunto, e as repetidas recebem trocas aleatórias
+        (ou são sorteadas de novo). Os filhos repetidos (entre si ou, no modelo estacionário, de
+        um indivíduo da população) são corrigidos antes da avaliação, então não gastam avaliações.
+        O total fica em `self.duplicatas_suprimidas`.
+
+        Com `caminho_checkpoint`, `executar` grava o estado completo (população, custos,
+        geração, melhor custo, contadores, parâmetros adaptados e estado do gerador) a cada
+        `intervalo_checkpoint` gerações, de forma atômica, e retoma desse arquivo se ele existir.
+        A execução retomada é idêntica à ininterrupta (o conteúdo do cache de custos não é
+        salvo, então só a contagem de avaliações pode diferir). O arquivo é removido ao final.
+        O checkpoint guarda também a instância (exato.chave_instancia) e o estado inicial do
+        gerador: um arquivo de outra instância ou semente é ignorado (e sobrescrito). O traço do
+        melhor custo por geração (`self.traco`) também é salvo, então cobre a execução inteira;
+        o tempo gasto antes da interrupção fica em `self.tempo_retomado`.
+
+        `modelo` = 'estacionario' troca a geração inteira por passos de `filhos_por_passo` filhos
+        (veja passo_estacionario): cada "geração" de `executar` (e portanto cada unidade
+        de `max_geracoes`) passa a ser um passo, o elitismo é implícito e `metodo_elitismo` é
+        ignorado. `paciencia`, `intervalo_impressao` e `intervalo_checkpoint` continuam em gerações
+        equivalentes: cada uma vale tamanho_populacao / filhos_por_passo passos.
+        Passos muito pequenos pagam o custo fixo das chamadas numpy: 2 filhos por passo dão a
+        granularidade mais fina; algumas dezenas amortizam melhor o tempo por avaliação.
+
+        Com `limitante` (implícito se houver `gap_alvo`), o limitante de Gilmore-Lawler da
+        instância é calculado antes da execução e cada geração reporta o gap de otimalidade
+        (melhor custo - limitante) / limitante, guardado em `self.gap`. Um melhor custo igual
+        ao limitante é ótimo comprovado e encerra a execução ('otimo').
+
+        `avaliador` escolhe como os custos são calculados (veja avaliacao.py): 'serial' (no próprio
+        processo), 'threads' ou 'processos' (pools de `trabalhadores_avaliacao` trabalhadores, por
+        padrão um por núcleo), ou uma instância de avaliador (para compartilhar o pool entre
+        execuções). O cache de custos continua na frente do avaliador. Um avaliador criado aqui
+        tem o pool liberado por `fechar`, chamado ao final de `executar` mesmo se ela for
+        interrompida; quem usa só `passo` deve chamá-lo.
+        """
         
         self.pqc = pqc
         self.tamanho_populacao = tamanho_populacao
@@ -23,21 +130,97 @@ class AlgoritmoGenetico:
         self.metodo_elitismo = metodo_elitismo
         self.metodo_mutacao = metodo_mutacao
         self.pmx_retorna_um_filho = pmx_retorna_um_filho # Salvar o parâmetro
-        self.populacao = self._gerar_populacao_inicial()
+        self.rng = np.random.default_rng(rng)
+        self.paciencia = paciencia
+        self.tempo_limite = tempo_limite
+        self.max_avaliacoes = max_avaliacoes
+        self.avaliacoes = 0
+        self.geracoes_executadas = 0
+        self.motivo_parada = None
+        self.cache = CacheCustos(cache) if isinstance(cache, int) else cache
+        self._avaliador_proprio = isinstance(avaliador, str)
+        self.avaliador = criar_avaliador(avaliador, pqc, trabalhadores_avaliacao) if self._avaliador_proprio else avaliador
+        self.metodo_busca_local = metodo_busca_local
+        self.fracao_busca_local = fracao_busca_local
+        self.max_iteracoes_busca_local = max_iteracoes_busca_local
+        self.tempo_busca_local = tempo_busca_local
+        self.telemetria = telemetria
+        self.intervalo_impressao = intervalo_impressao
+        self.tamanho_torneio = tamanho_torneio
+        self.controle_adaptativo = ControleAdaptativo() if controle_adaptativo is True else controle_adaptativo
+        self.diversidade = None
+        self.fracao_imigrantes = 0.0
+        self.populacao_unica = populacao_unica
+        self.caminho_checkpoint = caminho_checkpoint
+        self.intervalo_checkpoint = intervalo_checkpoint
+        # Identifica a execução no checkpoint: instância e semente (estado do gerador antes do primeiro sorteio)
+        self._identidade = np.array([chave_instancia(pqc), checkpoint.estado_rng(self.rng)]) \
+            if caminho_checkpoint else None
+        if modelo not in ('geracional', 'estacionario'):
+            raise ValueError(f"Modelo desconhecido: {modelo}")
+        self.modelo = modelo
+        self.filhos_por_passo = filhos_por_passo
+        # No modelo estacionário, paciencia, intervalo_impressao e intervalo_checkpoint contam gerações
+        # equivalentes (tamanho_populacao filhos), não passos: com 2 filhos por passo, paciencia=50
+        # pararia após ~100 avaliações sem melhoria e o console teria uma linha por passo
+        passos_por_geracao = 1 if modelo == 'geracional' else max(1, math.ceil(tamanho_populacao / filhos_por_passo))
+        self._passos_paciencia = paciencia * passos_por_geracao if paciencia is not None else None
+        self._passos_impressao = intervalo_impressao * passos_por_geracao
+        self._passos_checkpoint = intervalo_checkpoint * passos_por_geracao
+        self._heap = None    # Max-heap (-custo, linha) dos piores, montado no primeiro passo estacionário
+        self._chaves = None  # Bytes das linhas da população (modo estacionário com populacao_unica)
+        self._elite_buscada = None  # Melhor elite após a última busca local: não é buscada de novo
+        self.gap_alvo = gap_alvo
+        self.limitante = pqc.limitante_gilmore_lawler() if limitante or gap_alvo is not None else None
+        self.gap = None
+        self.traco = []             # Melhor custo de cada geração de `executar`, desde a geração 0
+        self.tempo_retomado = 0.0   # Segundos de `executar` antes da interrupção, ao retomar de um checkpoint
+        self.duplicatas_suprimidas = 0
+        if populacao_unica and math.factorial(pqc.n) < tamanho_populacao:
+            raise ValueError(f"Não existem {tamanho_populacao} permutações distintas de {pqc.n} elementos")
+        self.perfil = Perfil() if perfil is True else (perfil or None)
+        if self.perfil is not None:
+            self._iniciar_perfil, self._marcar = self.perfil.iniciar, self.perfil.marcar
+        else:
+            self._iniciar_perfil, self._marcar = lambda: None, lambda fase: None  # Custo desprezível desativado
+        self._populacao = Populacao(tamanho_populacao, pqc.n)
+        self._gerar_populacao_inicial()
 
-    def _gerar_populacao_inicial(self) -> List[List[int]]:#vai gerar permutação aletoria ajuda na diversividade
-        return [np.random.permutation(self.pqc.n).tolist()
-                for _ in range(self.tamanho_populacao)]
+    @property
+    def populacao(self) -> np.ndarray:
+        """Geração atual como matriz (tamanho_populacao x n)."""
+        return self._populacao.individuos
 
-    def _calcular_fitness(self) -> List[float]:
-        return [1 / (1 + self.pqc.calcular_custo(ind)) for ind in self.populacao]
+    @property
+    def custos(self) -> np.ndarray:
+        """Custos da geração atual, paralelos às linhas de `populacao`."""
+        return self._populacao.custos
+
+    def _gerar_populacao_inicial(self):#vai gerar permutação aletoria ajuda na diversividade
+        self._populacao.gerar_aleatorios(self._populacao.individuos, self.rng)
+        if self.populacao_unica:
+            self._remover_duplicatas(self._populacao.individuos)
+        self._populacao.custos[:] = self._avaliar(self._populacao.individuos)
+        self._populacao.atualizar_fitness()
+
+    def _avaliar(self, individuos: np.ndarray) -> np.ndarray:
+        """Custo completo de cada linha de `individuos` (contabilizado em `self.avaliacoes`)."""
+        if self.cache is None:
+            self.avaliacoes += len(individuos)
+            return self.avaliador(individuos)
+        custos, avaliados = self.cache.avaliar(individuos, self.avaliador)
+        self.avaliacoes += avaliados
+        return custos
+
+    def _calcular_fitness(self) -> np.ndarray:
+        return self._populacao.fitness
 
     def aplicar_crossover(self, pai1: List[int], pai2: List[int]) -> List[int]:
         """Aplica o crossover com base no método selecionado."""
         if self.metodo_crossover == 'ox':
-            return Crossover.ox(pai1, pai2)
+            return Crossover.ox(pai1, pai2, self.rng)
         elif self.metodo_crossover == 'pmx':
-            filho1, filho2 = Crossover.pmx(pai1, pai2)
+            filho1, filho2 = Crossover.pmx(pai1, pai2, self.rng)
             if self.pmx_retorna_um_filho:
                 return filho1  # Retorna apenas o primeiro filho
             else:
@@ -46,82 +229,407 @@ class AlgoritmoGenetico:
                 # Por exemplo, pode ser mais correto lançar uma exceção aqui
                 # se a flag pmx_retorna_um_filho = False, pois significa que
                 # o código chamador não está esperando 2 filhos.
-                return np.random.choice([filho1, filho2])
+                return filho1 if self.rng.random() < 0.5 else filho2
         else:
             raise ValueError(f"Método de crossover desconhecido: {self.metodo_crossover}")
 
-    # algoritmo_genetico.py (trecho corrigido)
-    def executar(self) -> List[int]:
-        melhor_custo_global = float('inf')
-        geracoes_sem_melhoria = 0
+    def aplicar_crossover_lote(self, populacao: np.ndarray, pais1: np.ndarray, pais2: np.ndarray) -> np.ndarray:
+        """Gera um filho para cada par (pais1[k], pais2[k]) de linhas da população, em uma única chamada."""
+        pontos1, pontos2 = Crossover.sortear_pontos(len(pais1), self.pqc.n, self.rng)
+        if self.metodo_crossover == 'ox':
+            return Crossover.ox_lote(populacao, pais1, pais2, pontos1, pontos2)
+        elif self.metodo_crossover == 'pmx':
+            filhos1, filhos2 = Crossover.pmx_lote(populacao, pais1, pais2, pontos1, pontos2)
+            if self.pmx_retorna_um_filho:
+                return filhos1
+            escolha = self.rng.random(len(pais1)) < 0.5
+            return np.where(escolha[:, None], filhos1, filhos2)
+        else:
+            raise ValueError(f"Método de crossover desconhecido: {self.metodo_crossover}")
+
+    def _selecionar(self, fitness: np.ndarray, quantidade: int = None) -> np.ndarray:
+        if self.metodo_selecao == 'torneio':
+            return Selecao.torneio_indices(fitness, self.tamanho_torneio, self.rng, quantidade)
+        elif self.metodo_selecao == 'roleta':
+            return Selecao.roleta_indices(fitness, self.rng, quantidade)
+        else:
+            raise ValueError(f"Método de seleção desconhecido: {self.metodo_selecao}")
+
+    def _indices_elites(self, fitness: np.ndarray, n_elites: int) -> np.ndarray:
+        if self.metodo_elitismo == 'top':
+            return Elitismo.indices_melhores(fitness, n_elites)
+        elif self.metodo_elitismo == 'hibrido':
+            n_aleatorios = max(1, int(n_elites * 0.5))
+            return Elitismo.indices_melhores_e_aleatorios(fitness, n_elites, n_aleatorios, self.rng)
+        else:
+            raise ValueError(f"Método de elitismo desconhecido: {self.metodo_elitismo}")
 
-        for geracao in range(self.max_geracoes):
-            custos = [self.pqc.calcular_custo(ind) for ind in self.populacao]
-            fitness = [1 / (1 + custo) for custo in custos]
+    def _mutar(self, filhos: np.ndarray):
+        """
+        Aplica a mutação in-place nas linhas de `filhos`. Os filhos ainda não têm custo: são
+        mutados antes da avaliação, que então é a única. Um delta sobre um custo recém-calculado
+        não pouparia avaliação nenhuma (e o de inversão é O(n * (j - i)), não O(n)).
+        """
+        if self.metodo_mutacao == 'swap':
+            Mutacao.swap_lote(filhos, self.taxa_mutacao, self.rng)
+        elif self.metodo_mutacao == 'inversao':
+            Mutacao.inversao_lote(filhos, self.taxa_mutacao, self.rng)
+        else:
+            raise ValueError(f"Método de mutação desconhecido: {self.metodo_mutacao}")
 
-            melhor_custo = min(custos)
-            media_custo = int(np.mean(custos))  # Converta explicitamente para int
-            pior_custo = max(custos)
+    def _adaptar(self, atual: np.ndarray):
+        if self.controle_adaptativo is not None:
+            self.diversidade = self.controle_adaptativo.medir(atual, self.rng)
+            self.taxa_mutacao, self.tamanho_torneio, self.fracao_imigrantes = \
+                self.controle_adaptativo.ajustar(self.diversidade, self.taxa_mutacao, self.tamanho_torneio)
+            self._marcar('adaptacao')
 
-            # Linha corrigida (garanta UTF-8 e formatação correta)
-            print(f"Geração {geracao:3d} | Melhor: {melhor_custo:5d} | Média: {media_custo:5d} | Pior: {pior_custo:5d}")
+    def passo(self):
+        """Avança um passo de `executar`: uma geração inteira ou um passo estacionário, conforme `modelo`."""
+        if self.modelo == 'estacionario':
+            self.passo_estacionario()
+        else:
+            self.proxima_geracao()
 
+    def proxima_geracao(self):
+        """Produz a próxima geração a partir da atual (seleção, elitismo, crossover e mutação)."""
+        populacao = self._populacao
+        atual, custos = populacao.individuos, populacao.custos
+        fitness = populacao.fitness
+        self._iniciar_perfil()
+        self._adaptar(atual)
 
-            # Seleção
-            if self.metodo_selecao == 'torneio':
-                selecionados = Selecao.torneio_eficiente(self.populacao, fitness)  # <--- Corrigido
-            elif self.metodo_selecao == 'roleta':
-                selecionados = Selecao.roleta(self.populacao, fitness)
-            else:
-                raise ValueError(f"Método de seleção desconhecido: {self.metodo_selecao}")
-
-
-            # Crossover
-            filhos = []
-            n_elites = max(1, int(self.taxa_elitismo * self.tamanho_populacao))
-            
-            # Garante que o número de crossovers seja par se o PMX retornar dois filhos
-            num_crossovers = self.tamanho_populacao - n_elites
-            if self.metodo_crossover == 'pmx' and not self.pmx_retorna_um_filho:
-                num_crossovers = (num_crossovers // 2) * 2  # Arredonda para o número par mais próximo
-
-            for _ in range(num_crossovers):
-                pai1, pai2 = selecionados[np.random.randint(len(selecionados))], \
-                            selecionados[np.random.randint(len(selecionados))]
-                
-                filho = self.aplicar_crossover(pai1, pai2)
-
-                # Mutação
-                if np.random.rand() < self.taxa_mutacao:
-                    if self.metodo_mutacao == 'swap':
-                        filho = Mutacao.swap(filho)
-                    elif self.metodo_mutacao == 'inversao':
-                        filho = Mutacao.inversao(filho)
-                    else:
-                        raise ValueError(f"Método de mutação desconhecido: {self.metodo_mutacao}")
-                
-                filhos.append(filho)
-
-            # Elitismo
-            if self.metodo_elitismo == 'top':
-                elites = Elitismo.manter_melhores(self.populacao, fitness, n_elites)
-            elif self.metodo_elitismo == 'hibrido':
-                n_aleatorios = max(1, int(n_elites * 0.5))
-                elites = Elitismo.manter_melhores_e_aleatorios(
-                    self.populacao, fitness, n_elites, n_aleatorios)
-            else:
-                raise ValueError(f"Método de elitismo desconhecido: {self.metodo_elitismo}")
+        # Seleção e elitismo trabalham apenas com índices da matriz da população
+        selecionados = self._selecionar(fitness)
+        self._marcar('selecao')
+        n_elites = max(1, int(self.taxa_elitismo * self.tamanho_populacao))
+        indices_elites = self._indices_elites(fitness, n_elites)
+        n_fixos = len(indices_elites)
+
+        # A próxima geração é escrita diretamente no buffer de trás
+        proxima, custos_proxima = populacao.proxima()
+        proxima[:n_fixos] = atual[indices_elites]
+        custos_proxima[:n_fixos] = custos[indices_elites]  # Elites nunca são reavaliadas
+        self._marcar('elitismo')
+
+        # Crossover
+        # Garante que o número de crossovers seja par se o PMX retornar dois filhos
+        # Imigrantes aleatórios (controle adaptativo) ocupam as vagas finais no lugar de filhos
+        num_crossovers = self.tamanho_populacao - n_fixos
+        num_crossovers -= int(self.fracao_imigrantes * num_crossovers)
+        if self.metodo_crossover == 'pmx' and not self.pmx_retorna_um_filho:
+            num_crossovers = (num_crossovers // 2) * 2  # Arredonda para o número par mais próximo
+
+        pais = selecionados[self.rng.integers(len(selecionados), size=(2, num_crossovers))]
+        pais1, pais2 = pais[0], pais[1]
+        proxima[n_fixos:n_fixos + num_crossovers] = self.aplicar_crossover_lote(atual, pais1, pais2)
+        self._marcar('crossover')
+        self._mutar(proxima[n_fixos:n_fixos + num_crossovers])
+        self._marcar('mutacao')
 
-            # Completa a nova população com indivíduos aleatórios se necessário
-            while len(filhos) < self.tamanho_populacao - n_elites:
-                filhos.append(np.random.permutation(self.pqc.n).tolist())
+        # Completa a nova população com indivíduos aleatórios se necessário
+        populacao.gerar_aleatorios(proxima[n_fixos + num_crossovers:], self.rng)
+        self._marcar('reposicao')
 
+        if self.populacao_unica:
+            # Só as elites repetidas (elitismo híbrido) têm o custo ajustado: os filhos ainda
+            # serão avaliados logo abaixo, então sorteá-los de novo não gasta avaliações
+            self._remover_duplicatas(proxima, custos_proxima[:n_fixos])
+            self._marcar('unicidade')
 
-            self.populacao = elites + filhos
+        # Os filhos (já mutados) são avaliados uma única vez; as elites mantêm o custo conhecido
+        custos_proxima[n_fixos:] = self._avaliar(proxima[n_fixos:])
+        self._marcar('avaliacao')
+
+        if self.metodo_busca_local is not None:
+            # A melhor elite está na linha 0 e só é buscada se mudou desde a última busca (senão já
+            # é o resultado dela); os filhos são sorteados entre as demais linhas
+            n_filhos = int(round(self.fracao_busca_local * (self.tamanho_populacao - n_fixos)))
+            linhas = n_fixos + self.rng.choice(self.tamanho_populacao - n_fixos, n_filhos, replace=False)
+            if not np.array_equal(proxima[0], self._elite_buscada):
+                linhas = np.concatenate(([0], linhas))
+            self._busca_local(proxima, custos_proxima, linhas)
+            self._elite_buscada = proxima[0].copy()
+            self._marcar('busca_local')
+
+        if self.populacao_unica:
+            # A busca local pode recriar repetidos; aqui já existem custos a ajustar
+            self._remover_duplicatas(proxima, custos_proxima)
+            self._marcar('unicidade')
+
+        populacao.trocar()
+        self._heap = None
+        self._marcar('fitness')
+
+    def _montar_heap(self):
+        """Heap dos piores indivíduos: a raiz é sempre (-pior custo, linha do pior)."""
+        self._heap = [(-int(custo), linha) for linha, custo in enumerate(self.custos)]
+        heapq.heapify(self._heap)
+        if self.populacao_unica:
+            self._chaves = {individuo.tobytes() for individuo in self.populacao}
+
+    def passo_estacionario(self):
+        """
+        Passo do modelo estacionário: gera e avalia apenas `filhos_por_passo` filhos e cada um
+        substitui o pior indivíduo da população se for estritamente melhor que ele. O pior é a
+        raiz de um heap, então cada substituição custa O(log tamanho_populacao) e o trabalho do
+        passo é proporcional ao número de filhos, não ao tamanho da população.
+        """
+        populacao = self._populacao
+        self._iniciar_perfil()
+        self._adaptar(populacao.individuos)
+        if self._heap is None:
+            self._montar_heap()
+
+        num_filhos = self.filhos_por_passo
+        num_crossovers = num_filhos - int(self.fracao_imigrantes * num_filhos)
+        pais = self._selecionar(populacao.fitness, 2 * num_crossovers).reshape(2, num_crossovers)
+        self._marcar('selecao')
+
+        filhos = np.empty((num_filhos, self.pqc.n), dtype=populacao.individuos.dtype)
+        filhos[:num_crossovers] = self.aplicar_crossover_lote(populacao.individuos, pais[0], pais[1])
+        self._marcar('crossover')
+        self._mutar(filhos[:num_crossovers])
+        self._marcar('mutacao')
+        populacao.gerar_aleatorios(filhos[num_crossovers:], self.rng)
+        self._marcar('reposicao')
+
+        if self.populacao_unica:
+            # Filhos repetidos entre si ou de alguém da população são corrigidos antes da avaliação;
+            # as chaves deles só entram no conjunto ao substituir uma linha
+            self._remover_duplicatas(filhos, vistos=self._chaves)
+            self._chaves.difference_update(filho.tobytes() for filho in filhos)
+            self._marcar('unicidade')
+
+        custos_filhos = self._avaliar(filhos)
+        self._marcar('avaliacao')
+
+        if self.metodo_busca_local is not None:
+            # Com poucos filhos por passo, a fração vira a probabilidade de cada filho ser refinado
+            linhas = np.flatnonzero(self.rng.random(num_filhos) < self.fracao_busca_local)
+            self._busca_local(filhos, custos_filhos, linhas)
+            self._marcar('busca_local')
+
+        for filho, custo in zip(filhos, custos_filhos):
+            pior_negativo, linha = self._heap[0]
+            if custo >= -pior_negativo:
+                continue
+            if self.populacao_unica:
+                chave = filho.tobytes()
+                if chave in self._chaves:  # Só a busca local ainda pode recriar um repetido
+                    self.duplicatas_suprimidas += 1
+                    continue
+                self._chaves.discard(populacao.individuos[linha].tobytes())
+                self._chaves.add(chave)
+            heapq.heapreplace(self._heap, (-int(custo), linha))
+            populacao.substituir(linha, filho, custo)
+        self._marcar('substituicao')
+
+    def _remover_duplicatas(self, individuos: np.ndarray, custos: np.ndarray = None, vistos: set = None):
+        """
+        Garante in-place que as linhas de `individuos` são distintas: a primeira ocorrência é
+        mantida e as seguintes recebem até TENTATIVAS_DUPLICATA trocas aleatórias e, se ainda
+        repetidas, são sorteadas de novo. Com `custos`, o custo das linhas alteradas é mantido
+        (pelo delta da troca, ou por uma avaliação completa das sorteadas); `custos` pode cobrir
+        só as primeiras linhas, e as demais (ainda não avaliadas) ficam sem ajuste. `vistos` são
+        chaves que também contam como repetidas; as das linhas de `individuos` são acrescentadas a ele.
+        """
+        n = self.pqc.n
+        vistos = set() if vistos is None else vistos
+        for linha, individuo in enumerate(individuos):
+            chave = individuo.tobytes()
+            if chave in vistos:
+                self.duplicatas_suprimidas += 1
+                ajustar = custos is not None and linha < len(custos)
+                for _ in range(TENTATIVAS_DUPLICATA):
+                    i, j = Mutacao.sortear_posicoes(n, self.rng)
+                    individuo[i], individuo[j] = individuo[j], individuo[i]
+                    if ajustar:
+                        # O delta é calculado sobre a linha já trocada: custo(nova) = custo(antiga) - delta
+                        custos[linha] -= self.pqc.delta_swap(individuo, i, j)
+                    chave = individuo.tobytes()
+                    if chave not in vistos:
+                        break
+                sorteado = False
+                while chave in vistos:
+                    individuo[:] = self.rng.permutation(n)
+                    chave, sorteado = individuo.tobytes(), True
+                if sorteado and ajustar:
+                    custos[linha] = self._avaliar(individuo[None])[0]
+            vistos.add(chave)
+
+    def _busca_local(self, individuos: np.ndarray, custos: np.ndarray, linhas: np.ndarray):
+        """Aplica a busca local selecionada in-place nas `linhas` indicadas."""
+        if self.metodo_busca_local == 'melhor':
+            def buscar(individuo, custo, tempo):
+                return BuscaLocal.melhor_melhoria(self.pqc, individuo, custo, self.max_iteracoes_busca_local, tempo)
+        elif self.metodo_busca_local == 'primeira':
+            def buscar(individuo, custo, tempo):
+                return BuscaLocal.primeira_melhoria(self.pqc, individuo, custo, self.max_iteracoes_busca_local,
+                                                    tempo, self.rng)
+        else:
+            raise ValueError(f"Método de busca local desconhecido: {self.metodo_busca_local}")
+
+        inicio = time.perf_counter()
+        for linha in linhas:
+            tempo_restante = None
+            if self.tempo_busca_local is not None:
+                tempo_restante = self.tempo_busca_local - (time.perf_counter() - inicio)
+                if tempo_restante <= 0:
+                    break
+            individuos[linha], custos[linha], _ = buscar(individuos[linha], int(custos[linha]), tempo_restante)
+
+    def melhores(self, quantidade: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Cópia dos `quantidade` melhores indivíduos da geração atual e de seus custos."""
+        indices = np.argsort(self.custos, kind='stable')[:quantidade]
+        return self.populacao[indices].copy(), self.custos[indices].copy()
+
+    def inserir_imigrantes(self, individuos: np.ndarray, custos: np.ndarray):
+        """Substitui os piores indivíduos da geração atual pelos imigrantes (que já trazem o custo)."""
+        indices = np.argsort(self.custos, kind='stable')[::-1][:len(individuos)]
+        self.populacao[indices] = individuos[:len(indices)]
+        self.custos[indices] = custos[:len(indices)]
+        self._populacao.atualizar_fitness()
+        self._heap = None
+
+    def _calcular_gap(self, custo: int) -> float:
+        """Gap de otimalidade relativo ao limitante (NaN se ele não foi calculado)."""
+        if self.limitante is None:
+            return float('nan')
+        if self.limitante == 0:
+            return 0.0 if custo == 0 else float('inf')
+        return (custo - self.limitante) / self.limitante
+
+    def _verificar_parada(self, geracoes_sem_melhoria: int, inicio: float) -> str:
+        """Retorna o motivo da parada, ou None se a execução deve continuar."""
+        if self.limitante is not None:
+            if self.gap <= 0:
+                return 'otimo'
+            if self.gap_alvo is not None and self.gap <= self.gap_alvo:
+                return 'gap_alvo'
+        if self._passos_paciencia is not None and geracoes_sem_melhoria >= self._passos_paciencia:
+            return 'estagnacao'
+        if self.tempo_limite is not None and time.perf_counter() - inicio >= self.tempo_limite:
+            return 'tempo_limite'
+        if self.max_avaliacoes is not None and self.avaliacoes >= self.max_avaliacoes:
+            return 'max_avaliacoes'
+        return None
+
+    def _mensagem_parada(self, motivo: str, geracao: int) -> str:
+        if motivo == 'otimo':
+            return f"Ótimo comprovado na geração {geracao}: melhor custo igual ao limitante {self.limitante}!"
+        elif motivo == 'gap_alvo':
+            return f"Gap de {self.gap:.2%} (alvo {self.gap_alvo:.2%}) atingido na geração {geracao}!"
+        if motivo == 'estagnacao':
+            return f"Convergência na geração {geracao} ({self.paciencia} gerações sem melhoria)!"
+        elif motivo == 'tempo_limite':
+            return f"Tempo limite de {self.tempo_limite}s atingido na geração {geracao}!"
+        return f"Limite de {self.max_avaliacoes} avaliações atingido na geração {geracao}!"
+
+    def _salvar_checkpoint(self, geracao: int, melhor_custo_global, geracoes_sem_melhoria: int, decorrido: float):
+        checkpoint.salvar_atomico(
+            self.caminho_checkpoint,
+            populacao=self.populacao, custos=self.custos,
+            contadores=np.array([geracao, geracoes_sem_melhoria, self.avaliacoes,
+                                 self.geracoes_executadas, self.duplicatas_suprimidas, self.tamanho_torneio]),
+            reais=np.array([melhor_custo_global, decorrido, self.taxa_mutacao, self.fracao_imigrantes]),
+            rng=checkpoint.estado_rng(self.rng), identidade=self._identidade,
+            traco=np.array(self.traco, dtype=np.int64))
+
+    def _restaurar_checkpoint(self) -> Tuple[int, float, int, float]:
+        """
+        Restaura o estado gravado por _salvar_checkpoint. Retorna (geração, melhor custo global,
+        gerações sem melhoria, tempo decorrido), ou os valores iniciais se não há checkpoint.
+        """
+        dados = checkpoint.carregar(self.caminho_checkpoint) if self.caminho_checkpoint else None
+        if dados is None:
+            return 0, float('inf'), 0, 0.0
+        if "identidade" not in dados or not np.array_equal(dados["identidade"], self._identidade):
+            if self.intervalo_impressao:
+                print(f"Checkpoint de outra instância ou semente ignorado: {self.caminho_checkpoint}")
+            return 0, float('inf'), 0, 0.0
+        self.populacao[:] = dados["populacao"]
+        self.custos[:] = dados["custos"]
+        self._populacao.atualizar_fitness()
+        self._heap = None
+        geracao, geracoes_sem_melhoria, self.avaliacoes, self.geracoes_executadas, \
+            self.duplicatas_suprimidas, self.tamanho_torneio = (int(v) for v in dados["contadores"])
+        melhor_custo_global, decorrido, self.taxa_mutacao, self.fracao_imigrantes = (float(v) for v in dados["reais"])
+        checkpoint.restaurar_rng(self.rng, dados["rng"])
+        self.traco = dados["traco"][:geracao].tolist()
+        self.tempo_retomado = decorrido
+        if self.intervalo_impressao:
+            print(f"Retomando do checkpoint na geração {geracao}")
+        return geracao, melhor_custo_global, geracoes_sem_melhoria, decorrido
+
+    def fechar(self):
+        """Libera o pool do avaliador criado por este AG (um avaliador recebido pronto é de quem o criou)."""
+        if self._avaliador_proprio:
+            self.avaliador.fechar()
+
+    def executar(self) -> List[int]:
+        try:
+            return self._executar()
+        finally:
+            self.fechar()  # Inclusive em exceções e Ctrl-C: não deixa processos nem memória compartilhada
+
+    def _executar(self) -> List[int]:
+        geracao_inicial, melhor_custo_global, geracoes_sem_melhoria, decorrido = self._restaurar_checkpoint()
+        inicio = time.perf_counter() - decorrido  # O tempo antes da interrupção conta para tempo_limite
+        self.motivo_parada = 'max_geracoes'
+
+        if self.intervalo_impressao and self.limitante is not None:
+            print(f"Limitante de Gilmore-Lawler: {self.limitante}")
+
+        for geracao in range(geracao_inicial, self.max_geracoes):
+            if self.caminho_checkpoint and geracao > geracao_inicial and geracao % self._passos_checkpoint == 0:
+                self._salvar_checkpoint(geracao, melhor_custo_global, geracoes_sem_melhoria,
+                                        time.perf_counter() - inicio)
+            self._iniciar_perfil()
+            custos = self.custos
+            indice_melhor = int(custos.argmin())
+            melhor_custo = int(custos[indice_melhor])
+            self.gap = self._calcular_gap(min(melhor_custo, melhor_custo_global))
+            self.traco.append(melhor_custo)
+
+            imprimir = self.intervalo_impressao and geracao % self._passos_impressao == 0
+            if imprimir or self.telemetria is not None:
+                media_custo = float(custos.mean())
+                pior_custo = int(custos.max())
+                if self.telemetria is not None:
+                    self.telemetria.registrar((
+                        geracao, melhor_custo, media_custo, pior_custo,
+                        diversidade(self.populacao, self.populacao[indice_melhor]),
+                        self.avaliacoes, time.perf_counter() - inicio, self.gap))
+                if imprimir:
+                    # Linha corrigida (garanta UTF-8 e formatação correta)
+                    linha = f"Geração {geracao:3d} | Melhor: {melhor_custo:5d} | Média: {int(media_custo):5d} | Pior: {pior_custo:5d}"
+                    if self.limitante is not None:
+                        linha += f" | Gap: {self.gap:.2%}"
+                    print(linha)
+            self._marcar('registro')
+
+            if melhor_custo < melhor_custo_global:
+                melhor_custo_global = melhor_custo
+                geracoes_sem_melhoria = 0
+            else:
+                geracoes_sem_melhoria += 1
 
             # Critério de parada
-            if geracoes_sem_melhoria >= 50:
-                print(f"Convergência na geração {geracao} (50 gerações sem melhoria)!")
+            motivo = self._verificar_parada(geracoes_sem_melhoria, inicio)
+            if motivo is not None:
+                self.motivo_parada = motivo
+                if self.intervalo_impressao:
+                    print(self._mensagem_parada(motivo, geracao))
                 break
 
-        return self.populacao[np.argmax(self._calcular_fitness())]  
+            self.passo()
+            self.geracoes_executadas += 1
+
+        if self.telemetria is not None:
+            if self.perfil is not None:
+                self.telemetria.registrar_perfil(self.perfil.resumo())
+            self.telemetria.descarregar()
+        if self.caminho_checkpoint and os.path.exists(self.caminho_checkpoint):
+            os.remove(self.caminho_checkpoint)  # Execução concluída: não há o que retomar
+        return self.populacao[np.argmax(self._calcular_fitness())].tolist()
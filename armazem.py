@@ -0,0 +1,223 @@
+# armazem.py
+import io
+import json
+import os
+import shutil
+import uuid
+import zipfile
+import numpy as np
+from typing import Dict, List
+from checkpoint import Diario
+
+# Parâmetros de `config` que também viram colunas (filtráveis em `ler` sem decodificar o JSON),
+# com o valor gravado quando a execução não os informa
+PARAMETROS = {
+    "experimento": ("U", ""),
+    "repeticao": (np.int32, -1),
+    "tamanho_populacao": (np.int32, -1),
+    "max_geracoes": (np.int32, -1),
+    "taxa_mutacao": (np.float64, np.nan),
+    "taxa_elitismo": (np.float64, np.nan),
+    "metodo_selecao": ("U", ""),
+    "metodo_crossover": ("U", ""),
+    "metodo_elitismo": ("U", ""),
+    "metodo_mutacao": ("U", ""),
+}
+
+# Esquema fixo de cada execução
+COLUNAS = {
+    "id_execucao": "U32",
+    "config": "U",        # JSON com todos os parâmetros da execução (largura variável)
+    "semente": np.int64,  # -1 quando a execução não foi semeada
+    "n": np.int32,
+    "custo": np.int64,
+    "tempo": np.float64,
+    **{nome: tipo for nome, (tipo, _) in PARAMETROS.items()},
+}
+
+
+class ArmazemResultados:
+    """
+    Armazenamento colunar e somente-anexação dos resultados de execuções.
+
+    O arquivo é um .npz comprimido (zip com DEFLATE). Cada lote anexado vira um conjunto
+    de membros "lote_XXXXXX/<coluna>.npy"; o traço por geração (melhor custo de cada
+    geração) é guardado achatado em "traco" com os deslocamentos em "traco_inicio".
+    Anexar não recomprime os lotes anteriores, e ler uma coluna só descomprime essa coluna.
+
+    As execuções do lote ainda não gravado ficam também em um diário ao lado do arquivo
+    ("<caminho>.pendentes.jsonl"), sincronizado a cada `adicionar`: uma execução adicionada
+    já está em disco, sem gravar um lote por execução (cada lote reabre o zip e é lido
+    separadamente). O diário é recarregado ao abrir o armazém e apagado quando o lote é gravado.
+    """
+
+    def __init__(self, caminho: str, tamanho_lote: int = 1000):
+        self.caminho = caminho
+        self.tamanho_lote = tamanho_lote
+        self._lotes_gravados = None  # Número de lotes do arquivo, lido do zip uma única vez
+        self._diario = Diario(caminho + ".pendentes.jsonl")
+        self._pendentes: List[Dict] = [{**r, "traco": np.asarray(r["traco"], dtype=np.int64)}
+                                       for r in self._diario.concluidas()]
+        if self._pendentes and self._pendentes[0]["id_execucao"] in self._ids_ultimo_lote():
+            # Interrompido entre gravar o lote e apagar o diário: as pendentes já estão no arquivo
+            self._pendentes = []
+            os.remove(self._diario.caminho)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+    def adicionar(self, config: Dict, n: int, custo: int, tempo: float,
+                  semente: int = None, traco=None, id_execucao: str = None) -> str:
+        """Acrescenta uma execução ao lote pendente e retorna seu id."""
+        id_execucao = id_execucao or uuid.uuid4().hex
+        registro = {
+            "id_execucao": id_execucao,
+            "config": json.dumps(config, sort_keys=True, ensure_ascii=False),
+            "semente": -1 if semente is None else int(semente),
+            "n": int(n),
+            "custo": int(custo),
+            "tempo": float(tempo),
+            **{nome: config.get(nome, padrao) for nome, (_, padrao) in PARAMETROS.items()},
+        }
+        traco = np.asarray([] if traco is None else traco, dtype=np.int64)
+        self._diario.registrar({**registro, "traco": traco.tolist()})
+        self._pendentes.append({**registro, "traco": traco})
+        if len(self._pendentes) >= self.tamanho_lote:
+            self.descarregar()
+        return id_execucao
+
+    @staticmethod
+    def _colunas_lote(registros: List[Dict]) -> Dict[str, np.ndarray]:
+        colunas = {nome: np.array([r[nome] for r in registros], dtype=tipo) for nome, tipo in COLUNAS.items()}
+        tracos = [r["traco"] for r in registros]
+        colunas["traco_inicio"] = np.concatenate(([0], np.cumsum([len(t) for t in tracos]))).astype(np.int64)
+        colunas["traco"] = np.concatenate(tracos) if tracos else np.empty(0, dtype=np.int64)
+        return colunas
+
+    @staticmethod
+    def _gravar_lote(arquivo: zipfile.ZipFile, lote: int, colunas: Dict[str, np.ndarray]):
+        for nome, valores in colunas.items():
+            buffer = io.BytesIO()
+            np.lib.format.write_array(buffer, valores, allow_pickle=False)
+            arquivo.writestr(f"lote_{lote:06d}/{nome}.npy", buffer.getvalue())
+
+    def _ids_ultimo_lote(self) -> np.ndarray:
+        if not os.path.exists(self.caminho):
+            return np.empty(0, dtype=COLUNAS["id_execucao"])
+        with zipfile.ZipFile(self.caminho) as arquivo:
+            lotes = self._lotes(arquivo)
+            self._lotes_gravados = len(lotes)
+            if not lotes:
+                return np.empty(0, dtype=COLUNAS["id_execucao"])
+            return self._ler_membro(arquivo, f"{lotes[-1]}/id_execucao.npy")
+
+    def descarregar(self):
+        """Grava o lote pendente como um novo lote do arquivo e esvazia o diário de pendentes."""
+        if not self._pendentes:
+            return
+        pasta = os.path.dirname(self.caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+
+        # O zip em modo "a" sobrescreve o diretório central no lugar: uma interrupção no meio
+        # corromperia os lotes anteriores. O lote é anexado a uma cópia, que substitui o original
+        temporario = self.caminho + ".tmp"
+        if os.path.exists(self.caminho):
+            shutil.copyfile(self.caminho, temporario)
+        elif os.path.exists(temporario):
+            os.remove(temporario)
+        with zipfile.ZipFile(temporario, mode="a", compression=zipfile.ZIP_DEFLATED) as arquivo:
+            if self._lotes_gravados is None:
+                self._lotes_gravados = len(self._lotes(arquivo))
+            self._gravar_lote(arquivo, self._lotes_gravados, self._colunas_lote(self._pendentes))
+        with open(temporario, "rb+") as arquivo:
+            os.fsync(arquivo.fileno())  # O lote está em disco antes de o diário sumir
+        os.replace(temporario, self.caminho)
+        self._lotes_gravados += 1
+        self._pendentes = []
+        os.remove(self._diario.caminho)
+
+    def compactar(self):
+        """
+        Reescreve o arquivo com todos os lotes (e as pendentes) fundidos em um único lote, de
+        forma atômica (arquivo temporário + os.replace). Útil para arquivos fragmentados em
+        muitos lotes pequenos, que ficam lentos de anexar e de ler.
+        """
+        dados = self.ler(colunas=list(COLUNAS), tracos=True)
+        if not len(dados["id_execucao"]):
+            return
+        registros = [{nome: dados[nome][k] for nome in dados} for k in range(len(dados["id_execucao"]))]
+        temporario = self.caminho + ".tmp"
+        with zipfile.ZipFile(temporario, mode="w", compression=zipfile.ZIP_DEFLATED) as arquivo:
+            self._gravar_lote(arquivo, 0, self._colunas_lote(registros))
+        with open(temporario, "rb+") as arquivo:
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, self.caminho)
+        self._lotes_gravados = 1
+        self._pendentes = []
+        if os.path.exists(self._diario.caminho):
+            os.remove(self._diario.caminho)
+
+    def fechar(self):
+        self.descarregar()
+
+    @staticmethod
+    def _lotes(arquivo: zipfile.ZipFile) -> List[str]:
+        return sorted({nome.split("/")[0] for nome in arquivo.namelist() if nome.startswith("lote_")})
+
+    @staticmethod
+    def _ler_membro(arquivo: zipfile.ZipFile, nome: str) -> np.ndarray:
+        with arquivo.open(nome) as membro:
+            return np.lib.format.read_array(io.BytesIO(membro.read()), allow_pickle=False)
+
+    def _ler_coluna(self, arquivo: zipfile.ZipFile, membros, lote: str, nome: str) -> np.ndarray:
+        if f"{lote}/{nome}.npy" in membros:
+            return self._ler_membro(arquivo, f"{lote}/{nome}.npy")
+        # Lotes gravados antes de o parâmetro virar coluna: valor padrão em todas as linhas
+        tamanho = len(self._ler_membro(arquivo, f"{lote}/traco_inicio.npy")) - 1
+        tipo, padrao = PARAMETROS[nome]
+        return np.full(tamanho, padrao, dtype=tipo if tipo != "U" else "U1")
+
+    def ler(self, colunas=None, tracos: bool = False, **filtros) -> Dict[str, np.ndarray]:
+        """
+        Lê as colunas pedidas (todas por padrão) de todos os lotes gravados e das pendentes.
+        `filtros` são igualdades coluna=valor (ou coluna=lista de valores) aplicadas de forma
+        vetorizada, ex.: ler(["custo"], experimento="parte_1_selecao", metodo_selecao="roleta");
+        com tracos=True inclui "traco", uma lista de arrays por execução.
+        """
+        colunas = list(COLUNAS) if colunas is None else list(colunas)
+        necessarias = list(dict.fromkeys(colunas + list(filtros)))
+        dados = {nome: [] for nome in necessarias}
+        lista_tracos = []
+
+        if os.path.exists(self.caminho):
+            with zipfile.ZipFile(self.caminho) as arquivo:
+                membros = set(arquivo.namelist())
+                for lote in self._lotes(arquivo):
+                    for nome in necessarias:
+                        dados[nome].append(self._ler_coluna(arquivo, membros, lote, nome))
+                    if tracos:
+                        inicio = self._ler_membro(arquivo, f"{lote}/traco_inicio.npy")
+                        valores = self._ler_membro(arquivo, f"{lote}/traco.npy")
+                        lista_tracos.extend(np.split(valores, inicio[1:-1]))
+        if self._pendentes:
+            pendentes = self._colunas_lote(self._pendentes)
+            for nome in necessarias:
+                dados[nome].append(pendentes[nome])
+            lista_tracos.extend(r["traco"] for r in self._pendentes)
+
+        resultado = {
+            nome: np.concatenate(partes) if partes else np.empty(0, dtype=COLUNAS[nome])
+            for nome, partes in dados.items()
+        }
+        mascara = np.ones(len(resultado[necessarias[0]]), dtype=bool)
+        for nome, valor in filtros.items():
+            mascara &= np.isin(resultado[nome], valor)
+
+        selecionado = {nome: resultado[nome][mascara] for nome in colunas}
+        if tracos:
+            selecionado["traco"] = [t for t, manter in zip(lista_tracos, mascara) if manter]
+        return selecionado
@@ -0,0 +1,137 @@
+# atribuicao.py
+import numpy as np
+from typing import Tuple
+
+
+def resolver_atribuicao(custos: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Problema de atribuição linear (método húngaro, versão de caminhos aumentantes mínimos com
+    potenciais, O(n³)): retorna (colunas, valor), com `colunas[i]` a coluna atribuída à linha i
+    e `valor` = sum(custos[i, colunas[i]]) mínimo. O laço sobre as colunas é vetorizado, então
+    restam O(n²) iterações em Python.
+    """
+    custos = np.asarray(custos)
+    n = len(custos)
+    if custos.shape != (n, n):
+        raise ValueError(f"Matriz de custos deve ser quadrada, recebido: {custos.shape}")
+    # Índice 0 é a coluna fictícia de onde parte cada caminho aumentante
+    a = np.zeros((n + 1, n + 1))
+    a[1:, 1:] = custos
+    u = np.zeros(n + 1)            # Potenciais das linhas
+    v = np.zeros(n + 1)            # Potenciais das colunas
+    linha_da_coluna = np.zeros(n + 1, dtype=np.int64)
+    anterior = np.zeros(n + 1, dtype=np.int64)
+
+    for i in range(1, n + 1):
+        linha_da_coluna[0] = i
+        coluna = 0
+        folga = np.full(n + 1, np.inf)
+        usada = np.zeros(n + 1, dtype=bool)
+        while linha_da_coluna[coluna] != 0:
+            usada[coluna] = True
+            linha = linha_da_coluna[coluna]
+            livres = np.flatnonzero(~usada)
+            reduzido = a[linha, livres] - u[linha] - v[livres]
+            melhorou = reduzido < folga[livres]
+            folga[livres[melhorou]] = reduzido[melhorou]
+            anterior[livres[melhorou]] = coluna
+            proxima = livres[np.argmin(folga[livres])]
+            delta = folga[proxima]
+            u[linha_da_coluna[usada]] += delta
+            v[usada] -= delta
+            folga[livres] -= delta
+            coluna = proxima
+        # Inverte o caminho aumentante até a coluna fictícia
+        while coluna:
+            linha_da_coluna[coluna] = linha_da_coluna[anterior[coluna]]
+            coluna = anterior[coluna]
+
+    colunas = np.empty(n, dtype=np.int64)
+    colunas[linha_da_coluna[1:] - 1] = np.arange(n)
+    return colunas, custos[np.arange(n), colunas].sum()
+
+
+def resolver_atribuicao_lote(custos: np.ndarray, limite: np.ndarray = None, duais: bool = False):
+    """
+    Valor ótimo da atribuição de cada matriz de `custos` (lote x n x n): o mesmo método húngaro
+    de resolver_atribuicao executado em paralelo sobre o lote, com as matrizes avançando seus
+    caminhos aumentantes no mesmo passo (as iterações em Python dependem de n, não do lote).
+
+    Os potenciais partem das reduções de linhas e colunas e as linhas com um zero livre já
+    começam atribuídas, então só as demais precisam de caminhos aumentantes. A soma dos
+    potenciais (valor dual) é um limitante inferior do ótimo que só cresce: com `limite`
+    (um valor por matriz), cada matriz é abandonada assim que o valor dual o alcança, e o
+    valor devolvido para ela é apenas esse limitante (>= limite).
+
+    Com `duais`, retorna também os potenciais (u das linhas, v das colunas): os custos reduzidos
+    custos - u[:, :, None] - v[:, None, :] são não negativos, e valor + custo reduzido de (i, j)
+    limita qualquer atribuição que use o par (i, j).
+    """
+    custos = np.asarray(custos, dtype=np.float64)
+    quantidade, n = custos.shape[:2]
+    todos = np.arange(quantidade)
+    # Índice 0 é a coluna fictícia de onde parte cada caminho aumentante
+    a = np.zeros((quantidade, n + 1, n + 1))
+    a[:, 1:, 1:] = custos
+    u = np.zeros((quantidade, n + 1))
+    v = np.zeros((quantidade, n + 1))
+    u[:, 1:] = custos.min(axis=2)
+    v[:, 1:] = (custos - u[:, 1:, None]).min(axis=1)
+    linha_da_coluna = np.zeros((quantidade, n + 1), dtype=np.int64)
+    anterior = np.zeros((quantidade, n + 1), dtype=np.int64)
+    atribuida = np.zeros((quantidade, n + 1), dtype=bool)
+
+    # Atribuição gulosa inicial sobre os zeros do custo reduzido
+    for i in range(1, n + 1):
+        zeros_livres = (a[:, i, 1:] - u[:, i, None] - v[:, 1:] == 0) & (linha_da_coluna[:, 1:] == 0)
+        casadas = todos[zeros_livres.any(axis=1)]
+        linha_da_coluna[casadas, 1 + zeros_livres[casadas].argmax(axis=1)] = i
+        atribuida[casadas, i] = True
+
+    # Cada passo do caminho aumentante soma exatamente delta ao valor dual
+    valor = u[:, 1:].sum(axis=1) + v[:, 1:].sum(axis=1)
+    limite = np.full(quantidade, np.inf) if limite is None else np.asarray(limite, dtype=np.float64)
+    em_aberto = todos[valor < limite]
+    for i in range(1, n + 1):
+        ativos = em_aberto[~atribuida[em_aberto, i]]
+        linha_da_coluna[ativos, 0] = i
+        coluna = np.zeros(quantidade, dtype=np.int64)
+        folga = np.full((quantidade, n + 1), np.inf)
+        usada = np.zeros((quantidade, n + 1), dtype=bool)
+        pendentes = ativos
+        while len(ativos):
+            colunas_ativas = coluna[ativos]
+            usada[ativos, colunas_ativas] = True
+            linhas = linha_da_coluna[ativos, colunas_ativas]
+            reduzido = a[ativos, linhas] - u[ativos, linhas][:, None] - v[ativos]
+            livres = ~usada[ativos]
+            folga_ativa = folga[ativos]
+            melhorou = livres & (reduzido < folga_ativa)
+            folga_ativa = np.where(melhorou, reduzido, folga_ativa)
+            anterior[ativos] = np.where(melhorou, colunas_ativas[:, None], anterior[ativos])
+            candidatas = np.where(livres, folga_ativa, np.inf)
+            proxima = candidatas.argmin(axis=1)
+            delta = candidatas[np.arange(len(ativos)), proxima]
+
+            usadas = ~livres
+            lote_usadas, colunas_usadas = np.nonzero(usadas)
+            u[ativos[lote_usadas], linha_da_coluna[ativos[lote_usadas], colunas_usadas]] += delta[lote_usadas]
+            v[ativos] -= np.where(usadas, delta[:, None], 0.0)
+            folga[ativos] = np.where(livres, folga_ativa - delta[:, None], folga_ativa)
+            coluna[ativos] = proxima
+            valor[ativos] += delta
+            ativos = ativos[(linha_da_coluna[ativos, proxima] != 0) & (valor[ativos] < limite[ativos])]
+        # Abandonadas (valor dual já no limite) ficam sem o aumento e saem das próximas linhas
+        em_aberto = em_aberto[valor[em_aberto] < limite[em_aberto]]
+        # Inverte os caminhos aumentantes até a coluna fictícia
+        ativos = pendentes[valor[pendentes] < limite[pendentes]]
+        while len(ativos):
+            origem = anterior[ativos, coluna[ativos]]
+            linha_da_coluna[ativos, coluna[ativos]] = linha_da_coluna[ativos, origem]
+            coluna[ativos] = origem
+            ativos = ativos[origem != 0]
+
+    # A coluna fictícia só acumula o oposto dos incrementos da linha em aumento: fica fora da soma
+    if duais:
+        return valor, u[:, 1:], v[:, 1:]
+    return valor
@@ -0,0 +1,150 @@
+# avaliacao.py
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pqa import PQA
+
+# Linhas mínimas por tarefa: lotes menores são avaliados no próprio processo, onde o custo
+# de despachar a tarefa passaria do custo de avaliá-la
+LOTE_MINIMO_PADRAO = 64
+
+# Instância do PQA de cada processo trabalhador, sobre as matrizes em memória compartilhada
+_pqc_trabalhador = None
+_memorias_trabalhador = []  # Mantém os blocos anexados abertos enquanto o processo viver
+
+
+def _inicializar_trabalhador(pqc: PQA, matrizes):
+    """Recebe a instância pronta (instâncias do disco, reabertas por mmap) ou as matrizes compartilhadas."""
+    global _pqc_trabalhador
+    if pqc is not None:
+        _pqc_trabalhador = pqc
+        return
+    arrays = []
+    for nome, formato, tipo in matrizes:
+        memoria = shared_memory.SharedMemory(name=nome)
+        _memorias_trabalhador.append(memoria)
+        arrays.append(np.ndarray(formato, dtype=tipo, buffer=memoria.buf))
+    _pqc_trabalhador = PQA.de_matrizes(*arrays)
+
+
+def _calcular_custos_trabalhador(individuos: np.ndarray) -> np.ndarray:
+    return _pqc_trabalhador.calcular_custos(individuos)
+
+
+class AvaliadorSerial:
+    """Avaliação no próprio processo, em uma única chamada vetorizada de `pqc.calcular_custos`."""
+
+    def __init__(self, pqc: PQA):
+        self.pqc = pqc
+
+    def __call__(self, individuos: np.ndarray) -> np.ndarray:
+        return self.pqc.calcular_custos(individuos)
+
+    def fechar(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+
+class _AvaliadorPool(AvaliadorSerial):
+    """
+    Base dos avaliadores paralelos: divide o lote em até `trabalhadores` fatias contíguas de pelo
+    menos `lote_minimo` linhas e avalia cada uma em uma tarefa do pool. O pool é criado na primeira
+    avaliação grande e liberado por `fechar` (uma avaliação posterior o recria).
+    """
+
+    def __init__(self, pqc: PQA, trabalhadores: int = None, lote_minimo: int = LOTE_MINIMO_PADRAO):
+        super().__init__(pqc)
+        self.trabalhadores = trabalhadores or os.cpu_count() or 1
+        self.lote_minimo = max(1, lote_minimo)
+        self._executor = None
+
+    def _criar_executor(self):
+        raise NotImplementedError
+
+    def __call__(self, individuos: np.ndarray) -> np.ndarray:
+        individuos = np.asarray(individuos)
+        fatias = min(self.trabalhadores, len(individuos) // self.lote_minimo)
+        if fatias < 2:
+            return self.pqc.calcular_custos(individuos)
+        if self._executor is None:
+            self._executor = self._criar_executor()
+        return np.concatenate(list(self._executor.map(self._calcular, np.array_split(individuos, fatias))))
+
+    def fechar(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+class AvaliadorThreads(_AvaliadorPool):
+    """
+    Fatias avaliadas em threads sobre a mesma instância. Só compensa com n grande: a indexação
+    das distâncias e o produto/soma do bloco liberam o GIL, o restante da chamada não.
+    """
+
+    def _criar_executor(self):
+        return ThreadPoolExecutor(max_workers=self.trabalhadores)
+
+    def _calcular(self, individuos: np.ndarray) -> np.ndarray:
+        return self.pqc.calcular_custos(individuos)
+
+
+class AvaliadorProcessos(_AvaliadorPool):
+    """
+    Fatias avaliadas em um pool de processos. As matrizes são copiadas uma única vez para blocos
+    de memória compartilhada, que os trabalhadores anexam sem cópia; instâncias carregadas do
+    disco já são compartilhadas pelo mmap e são apenas reabertas. Por tarefa trafegam só as
+    permutações e os custos.
+    """
+
+    def __init__(self, pqc: PQA, trabalhadores: int = None, lote_minimo: int = LOTE_MINIMO_PADRAO):
+        super().__init__(pqc, trabalhadores, lote_minimo)
+        self._memorias = []
+
+    def _compartilhar(self):
+        matrizes = []
+        for matriz in (self.pqc.distancias, self.pqc.fluxo):
+            memoria = shared_memory.SharedMemory(create=True, size=max(1, matriz.nbytes))
+            np.ndarray(matriz.shape, dtype=matriz.dtype, buffer=memoria.buf)[:] = matriz
+            self._memorias.append(memoria)
+            matrizes.append((memoria.name, matriz.shape, matriz.dtype.str))
+        return matrizes
+
+    def _criar_executor(self):
+        if self.pqc.caminho is not None:
+            iniciais = (self.pqc, None)
+        else:
+            iniciais = (None, self._compartilhar())
+        return ProcessPoolExecutor(max_workers=self.trabalhadores, initializer=_inicializar_trabalhador,
+                                   initargs=iniciais)
+
+    _calcular = staticmethod(_calcular_custos_trabalhador)  # Função de módulo: serializável para o pool
+
+    def fechar(self):
+        super().fechar()
+        for memoria in self._memorias:
+            memoria.close()
+            memoria.unlink()
+        self._memorias = []
+
+
+AVALIADORES = {
+    'serial': AvaliadorSerial,
+    'threads': AvaliadorThreads,
+    'processos': AvaliadorProcessos,
+}
+
+
+def criar_avaliador(metodo: str, pqc: PQA, trabalhadores: int = None, lote_minimo: int = LOTE_MINIMO_PADRAO):
+    """Avaliador `metodo` ('serial', 'threads' ou 'processos') para a instância `pqc`."""
+    if metodo not in AVALIADORES:
+        raise ValueError(f"Avaliador desconhecido: {metodo}")
+    if metodo == 'serial':
+        return AvaliadorSerial(pqc)
+    return AVALIADORES[metodo](pqc, trabalhadores, lote_minimo)
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+# benchmark.py
+"""
+Benchmarks dos operadores e de execuções completas do AG, com linha de base em JSON.
+
+    python benchmark.py executar [--saida benchmarks/base.json] [--rapido]
+    python benchmark.py comparar benchmarks/base.json benchmarks/atual.json [--tolerancia 0.1]
+
+Cada caso é medido com `perf_counter` após `aquecimento` chamadas descartadas; o valor
+registrado é o tempo por chamada em `repeticoes` amostras (mínimo e mediana). A vazão (unidades de trabalho por segundo,
+ex.: indivíduos avaliados ou gerações) é o que o modo comparar usa para apontar regressões.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from statistics import median
+from typing import Callable, Dict, Iterator, Tuple
+import numpy as np
+from pqa import PQA
+from populacao import dtype_permutacao
+from operadores import Selecao, Crossover, Mutacao, BuscaLocal
+from algoritmo_genetico import AlgoritmoGenetico
+
+TAMANHOS_N = [10, 20, 50, 100, 200, 500]
+TAMANHOS_N_RAPIDO = [10, 50, 100]
+TAMANHOS_POPULACAO = [50, 200]
+# (n, pop) de calcular_custos medidos também no modo rápido: o n grande em que a troca de estratégia
+# de pqa.N_MINIMO_POR_LINHA importa
+CASOS_CALCULAR_CUSTOS = [(200, 500)]
+GERACOES_AG = 20
+REPETICOES = 5
+AQUECIMENTO = 1
+TEMPO_MINIMO_AMOSTRA = 0.05  # Segundos
+TOLERANCIA = 0.10  # Queda de vazão acima de 10% é regressão
+SEMENTE = 12345    # Carga de trabalho idêntica entre commits
+
+
+def medir(funcao: Callable[[], object], repeticoes: int = REPETICOES, aquecimento: int = AQUECIMENTO) -> Dict:
+    """
+    Tempo por chamada (em segundos) de `funcao`, em `repeticoes` amostras após o aquecimento.
+    Funções rápidas são chamadas várias vezes por amostra (como timeit.autorange), para que
+    cada amostra dure ao menos TEMPO_MINIMO_AMOSTRA e o ruído do relógio não domine.
+    """
+    for _ in range(aquecimento):
+        funcao()
+    chamadas = 1
+    while True:
+        inicio = time.perf_counter()
+        for _ in range(chamadas):
+            funcao()
+        if time.perf_counter() - inicio >= TEMPO_MINIMO_AMOSTRA:
+            break
+        chamadas *= 2
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for _ in range(chamadas):
+            funcao()
+        tempos.append((time.perf_counter() - inicio) / chamadas)
+    return {"mediana": median(tempos), "minimo": min(tempos), "repeticoes": repeticoes, "chamadas": chamadas}
+
+
+def casos(tamanhos_n, tamanhos_populacao) -> Iterator[Tuple[str, Callable[[], object], int]]:
+    """
+    Gera (nome, função, unidades de trabalho por chamada) para cada caso do benchmark.
+    As funções capturam as variáveis do laço: cada caso deve ser medido antes de avançar o gerador.
+    """
+    for n, tamanho in CASOS_CALCULAR_CUSTOS:
+        pqc = PQA(n=n, seed=SEMENTE)
+        rng = np.random.default_rng(SEMENTE)
+        populacao = rng.permuted(np.broadcast_to(np.arange(n, dtype=dtype_permutacao(n)), (tamanho, n)), axis=1)
+        yield f"pqa.calcular_custos/n={n}/pop={tamanho}", lambda: pqc.calcular_custos(populacao), tamanho
+
+    for n in tamanhos_n:
+        pqc = PQA(n=n, seed=SEMENTE)
+        rng = np.random.default_rng(SEMENTE)
+        individuo = rng.permutation(n).astype(dtype_permutacao(n))
+        custo = pqc.calcular_custo(individuo)
+        yield f"pqa.calcular_custo/n={n}", lambda: pqc.calcular_custo(individuo), 1
+        yield f"pqa.matriz_delta_swap/n={n}", lambda: pqc.matriz_delta_swap(individuo), 1
+        yield (f"busca_local.primeira_melhoria/n={n}",
+               lambda: BuscaLocal.primeira_melhoria(pqc, individuo.copy(), custo, max_iteracoes=10, rng=rng), 1)
+
+        for tamanho in tamanhos_populacao:
+            sufixo = f"n={n}/pop={tamanho}"
+            populacao = rng.permuted(np.broadcast_to(np.arange(n, dtype=dtype_permutacao(n)), (tamanho, n)), axis=1)
+            custos = pqc.calcular_custos(populacao)
+            fitness = 1 / (1 + custos)
+            pais1, pais2 = rng.integers(0, tamanho, size=(2, tamanho))
+            pontos1, pontos2 = Crossover.sortear_pontos(tamanho, n, rng)
+            trocas_i, trocas_j = rng.integers(0, n, size=(2, tamanho))
+            mutante = populacao.copy()
+
+            yield f"pqa.calcular_custos/{sufixo}", lambda: pqc.calcular_custos(populacao), tamanho
+            yield f"pqa.delta_swap_lote/{sufixo}", lambda: pqc.delta_swap_lote(populacao, trocas_i, trocas_j), tamanho
+            yield f"selecao.torneio/{sufixo}", lambda: Selecao.torneio_indices(fitness, rng=rng), tamanho
+            yield f"selecao.roleta/{sufixo}", lambda: Selecao.roleta_indices(fitness, rng=rng), tamanho
+            yield (f"crossover.ox_lote/{sufixo}",
+                   lambda: Crossover.ox_lote(populacao, pais1, pais2, pontos1, pontos2, validar=False), tamanho)
+            yield (f"crossover.pmx_lote/{sufixo}",
+                   lambda: Crossover.pmx_lote(populacao, pais1, pais2, pontos1, pontos2, validar=False), tamanho)
+            yield f"mutacao.swap_lote/{sufixo}", lambda: Mutacao.swap_lote(mutante, 1.0, rng), tamanho
+            yield f"mutacao.inversao_lote/{sufixo}", lambda: Mutacao.inversao_lote(mutante, 1.0, rng), tamanho
+
+            def executar_ag(pqc=pqc, tamanho=tamanho):
+                ag = AlgoritmoGenetico(pqc=pqc, tamanho_populacao=tamanho, max_geracoes=GERACOES_AG,
+                                       taxa_mutacao=0.05, taxa_elitismo=0.1, rng=SEMENTE,
+                                       paciencia=None, intervalo_impressao=0)
+                ag.executar()
+            yield f"ag.executar/{sufixo}", executar_ag, GERACOES_AG
+
+
+def _commit_atual() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+def executar(caminho_saida: str, rapido: bool = False) -> Dict:
+    tamanhos_n = TAMANHOS_N_RAPIDO if rapido else TAMANHOS_N
+    resultados = {}
+    for nome, funcao, unidades in casos(tamanhos_n, TAMANHOS_POPULACAO):
+        # Execuções completas do AG são longas: menos repetições
+        repeticoes = 3 if nome.startswith("ag.") else REPETICOES
+        medicao = medir(funcao, repeticoes)
+        # Vazão pelo menor tempo: o ruído (outros processos, frequência da CPU) só aumenta o tempo
+        medicao["vazao"] = unidades / medicao["minimo"]
+        resultados[nome] = medicao
+        print(f"{nome:50s} {medicao['mediana'] * 1e3:10.3f} ms | {medicao['vazao']:14.1f} un/s")
+
+    dados = {
+        "metadados": {
+            "commit": _commit_atual(),
+            "data": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "processador": platform.processor(),
+        },
+        "resultados": resultados,
+    }
+    pasta = os.path.dirname(caminho_saida)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    with open(caminho_saida, "w", encoding="utf-8") as arquivo:
+        json.dump(dados, arquivo, indent=2, ensure_ascii=False)
+    print(f"\nLinha de base salva em: {caminho_saida}")
+    return dados
+
+
+def comparar(caminho_base: str, caminho_atual: str, tolerancia: float = TOLERANCIA) -> Dict[str, float]:
+    """
+    Compara a vazão de cada caso presente nos dois arquivos e retorna as regressões
+    {caso: razão atual/base} cuja queda excede `tolerancia`.
+    """
+    with open(caminho_base, encoding="utf-8") as arquivo:
+        base = json.load(arquivo)
+    with open(caminho_atual, encoding="utf-8") as arquivo:
+        atual = json.load(arquivo)
+    print(f"Base: {base['metadados']['commit']} | Atual: {atual['metadados']['commit']}\n")
+
+    regressoes = {}
+    for nome in sorted(set(base["resultados"]) & set(atual["resultados"])):
+        razao = atual["resultados"][nome]["vazao"] / base["resultados"][nome]["vazao"]
+        marca = ""
+        if razao < 1 - tolerancia:
+            regressoes[nome] = razao
+            marca = "  <-- REGRESSÃO"
+        elif razao > 1 + tolerancia:
+            marca = "  (melhoria)"
+        print(f"{nome:50s} {razao:7.2f}x{marca}")
+
+    print(f"\n{len(regressoes)} regressão(ões) acima de {tolerancia:.0%}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do AG para o PQA")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    parser_executar = subcomandos.add_parser("executar", help="Mede todos os casos e salva a linha de base")
+    parser_executar.add_argument("--saida", default=f"benchmarks/{_commit_atual()}.json")
+    parser_executar.add_argument("--rapido", action="store_true", help=f"Apenas n em {TAMANHOS_N_RAPIDO}")
+
+    parser_comparar = subcomandos.add_parser("comparar", help="Compara duas linhas de base")
+    parser_comparar.add_argument("base")
+    parser_comparar.add_argument("atual")
+    parser_comparar.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+
+    argumentos = parser.parse_args()
+    if argumentos.comando == "executar":
+        executar(argumentos.saida, argumentos.rapido)
+    else:
+        regressoes = comparar(argumentos.base, argumentos.atual, argumentos.tolerancia)
+        sys.exit(1 if regressoes else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# busca_tabu.py
+import time
+import numpy as np
+from typing import List
+from pqa import PQA
+
+
+class BuscaTabuRobusta:
+    """
+    Busca Tabu Robusta (Ro-TS, Taillard 1991) sobre a mesma instância de PQA usada pelo AG.
+
+    A vizinhança é a troca de pares. A matriz de deltas (n x n) é calculada uma vez e depois
+    atualizada incrementalmente a cada movimento aceito: O(1) por par que não envolve as
+    posições trocadas e O(n) para as 2(n - 1) entradas que as envolvem.
+
+    Um movimento (r, s) é tabu se ambos os recursos voltariam a locais ocupados há menos de
+    `tenure` iterações. A duração tabu é sorteada em [0.9n, 1.1n] e renovada periodicamente.
+    Aspiração: o movimento é aceito se melhora o melhor custo conhecido, ou é forçado se
+    algum dos locais não é visitado há `aspiracao` iterações (diversificação de longo prazo).
+    """
+
+    def __init__(self, pqc: PQA, max_iteracoes: int = 10000, tempo_limite: float = None,
+                 custo_alvo: int = None, tenure_min: int = None, tenure_max: int = None,
+                 aspiracao: int = None, rng=None):
+        self.pqc = pqc
+        self.max_iteracoes = max_iteracoes
+        self.tempo_limite = tempo_limite
+        self.custo_alvo = custo_alvo
+        n = pqc.n
+        self.tenure_min = tenure_min if tenure_min is not None else max(1, int(0.9 * n))
+        self.tenure_max = tenure_max if tenure_max is not None else max(self.tenure_min, int(np.ceil(1.1 * n)))
+        self.aspiracao = aspiracao if aspiracao is not None else 5 * n * n
+        self.rng = np.random.default_rng(rng)
+
+        self.melhor_custo = None
+        self.iteracoes = 0
+        self.tempo_ate_melhor = None
+        self.motivo_parada = None
+
+    def executar(self) -> List[int]:
+        n = self.pqc.n
+        inicio = time.perf_counter()
+
+        perm = self.rng.permutation(n)
+        custo = self.pqc.calcular_custo(perm)
+        delta = self.pqc.matriz_delta_swap(perm)
+        melhor_perm, self.melhor_custo = perm.copy(), custo
+        self.tempo_ate_melhor = time.perf_counter() - inicio
+
+        # tabu[i, l]: iteração até a qual o recurso i não pode voltar ao local l
+        tabu = -(n * np.arange(n)[:, None] + np.arange(n)[None, :])
+        par = np.triu(np.ones((n, n), dtype=bool), k=1)
+        tenure = int(self.rng.integers(self.tenure_min, self.tenure_max + 1))
+        self.motivo_parada = 'max_iteracoes'
+
+        for iteracao in range(1, self.max_iteracoes + 1):
+            self.iteracoes = iteracao
+            if iteracao % (2 * self.tenure_max) == 0:
+                tenure = int(self.rng.integers(self.tenure_min, self.tenure_max + 1))
+
+            # ate[i, j] = tabu[i, perm[j]]: até quando i não pode ir para o local atual de j
+            ate = tabu[:, perm]
+            autorizado = par & ((ate < iteracao) | (ate.T < iteracao))
+            aspirado = par & ((ate < iteracao - self.aspiracao) | (ate.T < iteracao - self.aspiracao) |
+                              (custo + delta < self.melhor_custo))
+            candidatos = aspirado if aspirado.any() else (autorizado if autorizado.any() else par)
+
+            escolhido = np.argmin(np.where(candidatos, delta, np.iinfo(np.int64).max))
+            r, s = divmod(int(escolhido), n)
+
+            tabu[r, perm[r]] = iteracao + tenure
+            tabu[s, perm[s]] = iteracao + tenure
+            custo += int(delta[r, s])
+            perm[r], perm[s] = perm[s], perm[r]
+            self.pqc.atualizar_delta_swap(delta, perm, r, s)
+
+            if custo < self.melhor_custo:
+                melhor_perm, self.melhor_custo = perm.copy(), custo
+                self.tempo_ate_melhor = time.perf_counter() - inicio
+
+            if self.custo_alvo is not None and self.melhor_custo <= self.custo_alvo:
+                self.motivo_parada = 'custo_alvo'
+                break
+            if self.tempo_limite is not None and time.perf_counter() - inicio >= self.tempo_limite:
+                self.motivo_parada = 'tempo_limite'
+                break
+
+        return melhor_perm.tolist()
@@ -0,0 +1,67 @@
+# cache.py
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Tuple
+import numpy as np
+
+# Estimativa do custo em memória de uma entrada: chave de 16 bytes (objeto bytes),
+# int Python do custo e o nó do OrderedDict
+BYTES_POR_ENTRADA = 200
+
+
+class CacheCustos:
+    """
+    Cache LRU de custos indexado por um hash compacto (blake2b de 16 bytes) da permutação.
+    A capacidade é derivada de `memoria_maxima` (em bytes); quando cheia, a entrada
+    usada há mais tempo é descartada.
+    """
+
+    def __init__(self, memoria_maxima: int = 16 * 1024 * 1024):
+        self.capacidade = max(1, memoria_maxima // BYTES_POR_ENTRADA)
+        self._entradas = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+
+    @staticmethod
+    def chave(individuo: np.ndarray) -> bytes:
+        # Normaliza o tipo para que a mesma permutação gere a mesma chave em int16 ou int64
+        return hashlib.blake2b(np.ascontiguousarray(individuo, dtype=np.int32).tobytes(), digest_size=16).digest()
+
+    @property
+    def taxa_acerto(self) -> float:
+        total = self.acertos + self.falhas
+        return self.acertos / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def _inserir(self, chave: bytes, custo: int):
+        self._entradas[chave] = custo
+        self._entradas.move_to_end(chave)
+        while len(self._entradas) > self.capacidade:
+            self._entradas.popitem(last=False)
+
+    def avaliar(self, individuos: np.ndarray,
+                calcular_custos: Callable[[np.ndarray], np.ndarray]) -> Tuple[np.ndarray, int]:
+        """
+        Custos de cada linha de `individuos`. Só as linhas ausentes do cache são passadas
+        (em um único lote) a `calcular_custos`. Retorna (custos, número de linhas avaliadas).
+        """
+        chaves = [self.chave(individuo) for individuo in individuos]
+        custos = np.empty(len(individuos), dtype=np.int64)
+        faltantes = []
+        for k, chave in enumerate(chaves):
+            custo = self._entradas.get(chave)
+            if custo is None:
+                faltantes.append(k)
+            else:
+                self._entradas.move_to_end(chave)
+                custos[k] = custo
+
+        self.acertos += len(individuos) - len(faltantes)
+        self.falhas += len(faltantes)
+        if faltantes:
+            custos[faltantes] = calcular_custos(individuos[faltantes])
+            for k in faltantes:
+                self._inserir(chaves[k], int(custos[k]))
+        return custos, len(faltantes)
@@ -0,0 +1,90 @@
+# checkpoint.py
+import json
+import os
+import tempfile
+import numpy as np
+from typing import Callable, Dict, Iterator
+
+
+def _gravar_atomico(caminho: str, escrever: Callable):
+    """
+    Chama `escrever(arquivo)` sobre um arquivo temporário no mesmo diretório, força-o para o
+    disco e o renomeia por cima do anterior com os.replace. Quem ler o caminho vê sempre o
+    conteúdo antigo completo ou o novo completo, nunca um parcial.
+    """
+    pasta = os.path.dirname(caminho) or "."
+    os.makedirs(pasta, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=pasta, suffix=".tmp")
+    try:
+        with os.fdopen(descritor, "wb") as arquivo:
+            escrever(arquivo)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, caminho)
+    except BaseException:
+        os.remove(temporario)
+        raise
+
+
+def salvar_atomico(caminho: str, **arrays):
+    """Grava `arrays` em um .npz de forma atômica (veja _gravar_atomico)."""
+    _gravar_atomico(caminho, lambda arquivo: np.savez(arquivo, **arrays))
+
+
+def salvar_npy_atomico(caminho: str, array: np.ndarray):
+    """Grava um único .npy de forma atômica: nenhum leitor (ex.: np.load em mmap) vê o arquivo pela metade."""
+    _gravar_atomico(caminho, lambda arquivo: np.save(arquivo, array))
+
+
+def carregar(caminho: str) -> Dict[str, np.ndarray]:
+    """Conteúdo do checkpoint, ou None se ele não existe."""
+    if not os.path.exists(caminho):
+        return None
+    with np.load(caminho) as dados:
+        return {nome: dados[nome] for nome in dados.files}
+
+
+def estado_rng(rng: np.random.Generator) -> np.ndarray:
+    """Estado do gerador serializado (JSON) para caber em um .npz sem pickle."""
+    return np.array(json.dumps(rng.bit_generator.state))
+
+
+def restaurar_rng(rng: np.random.Generator, estado: np.ndarray):
+    rng.bit_generator.state = json.loads(str(estado))
+
+
+class Diario:
+    """
+    Registro somente-anexação (JSON, uma linha por tarefa) das tarefas concluídas de uma
+    varredura. Cada linha é gravada e sincronizada assim que a tarefa termina; ao retomar,
+    as tarefas presentes no diário não são executadas de novo.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        self._descartar_linha_incompleta()
+
+    def _descartar_linha_incompleta(self):
+        """Remove a última linha se a escrita dela foi interrompida (sem o '\\n' final)."""
+        if not os.path.exists(self.caminho):
+            return
+        with open(self.caminho, "rb+") as arquivo:
+            conteudo = arquivo.read()
+            if conteudo and not conteudo.endswith(b"\n"):
+                arquivo.truncate(conteudo.rfind(b"\n") + 1)
+
+    def concluidas(self) -> Iterator[Dict]:
+        if not os.path.exists(self.caminho):
+            return
+        with open(self.caminho, encoding="utf-8") as arquivo:
+            for linha in arquivo:
+                yield json.loads(linha)
+
+    def registrar(self, entrada: Dict):
+        with open(self.caminho, mode="a", encoding="utf-8") as arquivo:
+            arquivo.write(json.dumps(entrada) + "\n")
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
@@ -17,3 +17,5 @@ MAX_GERACOES = 100           # Limite máximo seguro
 TAXA_MUTACAO = 0.05         # Mais agressivo para diversidade
 TAXA_ELITISMO = 0.1          # 10% de elites
 SEED = None                  # Desativa seed para variabilidade
+ARQUIVO_RESULTADOS = "resultados/resultados.npz"  # Armazém colunar com todas as execuções
+ARQUIVO_OTIMOS = "resultados/otimos.jsonl"  # Custos ótimos por instância (exato.otimo), para o gap real
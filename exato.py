@@ -0,0 +1,352 @@
+# exato.py
+import hashlib
+import itertools
+import os
+import sys
+import time
+import multiprocessing as mp
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+from pqa import PQA
+from busca_tabu import BuscaTabuRobusta
+from checkpoint import Diario
+from atribuicao import resolver_atribuicao_lote
+
+LOTE_NOS = 512  # Nós da mesma profundidade expandidos por vez (limita a memória dos tensores de limitantes)
+PROFUNDIDADE_SONDAGEM = 4  # Máximo de níveis abertos em cada orientação para escolher a de menos nós vivos
+
+# Estado dos processos trabalhadores (veja _inicializar_trabalhador)
+_instancia_trabalhador = None
+_limite_compartilhado = None
+
+
+class _Instancia:
+    """
+    Matrizes reordenadas para a busca: a instalação da profundidade d é `ordem[d]`.
+
+    Com `trocar_papeis`, a busca roda sobre a instância transposta (fluxo como distâncias e
+    vice-versa), cujo custo de p^-1 é o custo original de p. O limitante da raiz é o mesmo,
+    mas o poder de poda nos níveis seguintes pode mudar muito (veja BranchAndBound).
+    """
+
+    def __init__(self, pqc: PQA, trocar_papeis: bool = False):
+        distancias, fluxo = (pqc.fluxo, pqc.distancias) if trocar_papeis else (pqc.distancias, pqc.fluxo)
+        self.trocar_papeis = trocar_papeis
+        # Instalações com mais fluxo primeiro: as decisões mais restritivas ficam no topo da árvore
+        self.ordem = np.argsort(-np.asarray(fluxo, dtype=np.int64).sum(axis=1), kind='stable')
+        self.n = pqc.n
+        self.distancias = np.asarray(distancias, dtype=np.float64)
+        self.fluxo = np.asarray(fluxo, dtype=np.float64)[np.ix_(self.ordem, self.ordem)]
+        # Por profundidade d (já alocadas 0..d-1): linhas de fluxo entre as não alocadas, sem a
+        # diagonal, em ordem crescente (parte fixa do Gilmore-Lawler), e os índices que removem
+        # cada um dos n - d locais livres
+        self.fluxo_ordenado = []
+        self.sem_cada = []
+        for d in range(self.n + 1):
+            m = self.n - d
+            sub = self.fluxo[d:, d:]
+            self.fluxo_ordenado.append(np.sort(sub[~np.eye(m, dtype=bool)].reshape(m, max(m - 1, 0)), axis=1))
+            sem_cada = [np.delete(np.arange(m), k) for k in range(m)]
+            self.sem_cada.append(np.array(sem_cada, dtype=np.int64).reshape(m, max(m - 1, 0)))
+
+    def expandir(self, prefixos: np.ndarray, parciais: np.ndarray, limitantes: np.ndarray, folgas: np.ndarray,
+                 melhor_custo: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Filhos de um lote de nós da mesma profundidade d (prefixos[b, j] = local da instalação j)
+        que ainda podem ter custo menor que `melhor_custo`. Retorna (prefixos, custos parciais,
+        limitantes, folgas) desses filhos; custos e limitantes na soma completa (o dobro do custo).
+
+        O custo parcial é incremental: alocar a instalação d no local l soma 2 * sum_j f[d, j] * D[l, p(j)].
+        O limitante de cada filho é o de Gilmore-Lawler restrito às não alocadas: a atribuição
+        ótima (método húngaro em lote) sobre 2 * (interação com as alocadas) + (produtos ordenados
+        entre as não alocadas). Os custos reduzidos dessa atribuição na coluna da próxima
+        instalação são as `folgas` do nó: limitante + folgas[l] limita o filho que a coloca no
+        l-ésimo local livre, o que poda filhos antes de montar as matrizes deles. A redução de
+        linhas e colunas descarta mais alguns antes do método húngaro.
+        """
+        n = self.n
+        quantidade, d = prefixos.shape
+        m = n - d
+        limiar = _limiar(melhor_custo)
+        livres = np.ones((quantidade, n), dtype=bool)
+        livres[np.arange(quantidade)[:, None], prefixos] = False
+        locais = np.nonzero(livres)[1].reshape(quantidade, m)
+
+        pais, posicoes = np.nonzero(limitantes[:, None] + folgas < limiar)
+        local = locais[pais, posicoes]
+        incremento = self.distancias[local[:, None], prefixos[pais]] @ self.fluxo[d, :d]
+        filhos = np.concatenate((prefixos[pais], local[:, None]), axis=1)
+        parciais = parciais[pais] + 2 * incremento
+        if m == 1:
+            vivos = parciais < limiar  # Permutações completas: o parcial é o custo exato
+            return filhos[vivos], parciais[vivos], parciais[vivos], np.empty((vivos.sum(), 0))
+
+        restantes = locais[pais[:, None], self.sem_cada[d][posicoes]]
+        # interacao[b, l, k] = sum_j D[l, p(j)] * f[k, j], para os locais l livres e as instalações k não alocadas
+        interacao = self.distancias[restantes[:, :, None], filhos[:, None, :]] @ self.fluxo[d + 1:, :d + 1].T
+        distancias_livres = self.distancias[restantes[:, :, None], restantes[:, None, :]]
+        fora_diagonal = ~np.eye(m - 1, dtype=bool)
+        distancias_livres = -np.sort(-distancias_livres[:, fora_diagonal].reshape(len(restantes), m - 1, m - 2), axis=2)
+        matriz = 2 * interacao + distancias_livres @ self.fluxo_ordenado[d + 1].T  # [b, local, instalação]
+
+        minimos_linhas = matriz.min(axis=2, keepdims=True)
+        minimos_colunas = matriz.min(axis=1, keepdims=True)
+        reducao = np.maximum(minimos_linhas.sum(axis=(1, 2)) + (matriz - minimos_linhas).min(axis=1).sum(axis=1),
+                             minimos_colunas.sum(axis=(1, 2)) + (matriz - minimos_colunas).min(axis=2).sum(axis=1))
+        vivos = parciais + reducao < limiar
+        filhos, parciais, matriz = filhos[vivos], parciais[vivos], matriz[vivos]
+        # O método húngaro abandona um filho assim que o valor dual garante a poda
+        valores, u, v = resolver_atribuicao_lote(matriz, limite=limiar - parciais, duais=True)
+        limitantes = parciais + valores
+        vivos = limitantes < limiar
+        folgas = matriz[vivos, :, 0] - u[vivos] - v[vivos, :1]
+        return filhos[vivos], parciais[vivos], limitantes[vivos], folgas
+
+    def permutacao(self, prefixo: np.ndarray) -> List[int]:
+        """Converte um prefixo completo (na ordem da busca) em permutação da instância original."""
+        permutacao = np.empty(self.n, dtype=np.int64)
+        permutacao[self.ordem] = prefixo
+        if self.trocar_papeis:
+            permutacao = np.argsort(permutacao)
+        return permutacao.tolist()
+
+
+def _custo(soma_completa) -> int:
+    """Custo a partir da soma completa (cada par não ordenado conta duas vezes)."""
+    return int(round(soma_completa)) // 2
+
+
+def _limiar(melhor_custo: int) -> int:
+    """Soma completa a partir da qual um nó é podado: o custo (metade, inteiro) não seria menor que `melhor_custo`."""
+    return 2 * melhor_custo - 1
+
+
+def _raiz(n: int) -> Tuple[np.ndarray, ...]:
+    """Lote com o nó raiz: (prefixos, parciais, limitantes, folgas), nada alocado."""
+    return np.empty((1, 0), dtype=np.int64), np.zeros(1), np.zeros(1), np.zeros((1, n))
+
+
+def _empilhar(pilha: list, nos: Tuple[np.ndarray, ...], lote: int):
+    """Empilha `nos` em lotes de até `lote`, os piores primeiro: o de menores limitantes sai antes."""
+    ordem = np.argsort(nos[2], kind='stable')
+    for inicio in reversed(range(0, len(ordem), lote)):
+        selecao = ordem[inicio:inicio + lote]
+        pilha.append(tuple(x[selecao] for x in nos))
+
+
+def _explorar(instancia: _Instancia, nos: Tuple[np.ndarray, ...], melhor_custo: int, prazo: float = None,
+              lote: int = LOTE_NOS) -> Tuple[int, np.ndarray, int, bool]:
+    """
+    Busca em profundidade a partir do lote `nos` (veja _raiz), expandindo até `lote` nós por vez;
+    os filhos de cada lote são empilhados por limitante, de modo que os mais promissores saem
+    primeiro. Retorna (custo do prefixo, melhor prefixo ou None se nada melhor que `melhor_custo`
+    foi encontrado, nós abertos que sobreviveram à poda, busca completa); sem prefixo, o custo
+    devolvido é o próprio `melhor_custo`.
+
+    Nos trabalhadores, o melhor custo é compartilhado entre os processos, mas só como limite de
+    poda: o custo devolvido é sempre o do prefixo que este processo encontrou, nunca o de outro.
+    """
+    pilha = []
+    _empilhar(pilha, nos, lote)
+    melhor_prefixo = None
+    limite = melhor_custo  # Poda: o melhor custo conhecido, inclusive o de outros processos
+    abertos = 0
+    while pilha:
+        if prazo is not None and time.time() >= prazo:
+            return melhor_custo, melhor_prefixo, abertos, False
+        if _limite_compartilhado is not None:
+            limite = min(limite, _limite_compartilhado.value)
+
+        nos = pilha.pop()
+        vivos = nos[2] < _limiar(limite)  # O incumbente pode ter melhorado desde o empilhamento
+        if not vivos.any():
+            continue
+        filhos = instancia.expandir(*(x[vivos] for x in nos), limite)
+        prefixos, parciais, limitantes, _ = filhos
+        abertos += len(prefixos)
+        if not len(prefixos):
+            continue
+
+        if prefixos.shape[1] == instancia.n:
+            indice = int(np.argmin(parciais))
+            if _custo(parciais[indice]) < limite:
+                melhor_custo, melhor_prefixo = _custo(parciais[indice]), prefixos[indice].copy()
+                limite = melhor_custo
+                if _limite_compartilhado is not None:
+                    with _limite_compartilhado.get_lock():
+                        _limite_compartilhado.value = min(_limite_compartilhado.value, melhor_custo)
+            continue
+
+        _empilhar(pilha, filhos, lote)
+    return melhor_custo, melhor_prefixo, abertos, True
+
+
+def _inicializar_trabalhador(instancia: _Instancia, limite):
+    global _instancia_trabalhador, _limite_compartilhado
+    _instancia_trabalhador, _limite_compartilhado = instancia, limite
+
+
+def _explorar_trabalhador(nos, melhor_custo, prazo, lote):
+    return _explorar(_instancia_trabalhador, nos, melhor_custo, prazo, lote)
+
+
+class BranchAndBound:
+    """
+    Solução exata do PQA por branch-and-bound, para instâncias pequenas (n <= ~14).
+
+    As instalações são alocadas uma por nível da árvore (as de maior fluxo primeiro), com o
+    custo parcial atualizado incrementalmente e poda pelo limitante de Gilmore-Lawler das
+    instalações restantes (veja _Instancia.expandir). O incumbente inicial vem de uma Busca
+    Tabu curta, então a árvore em geral só precisa provar que ele é ótimo.
+
+    A mesma instância pode ser resolvida com os papéis de fluxo e distâncias trocados, e o
+    tamanho da árvore muda por fatores de até ~10 entre as duas orientações: ambas são abertas
+    nível a nível até que uma tenha no máximo metade dos nós vivos da outra (ou até
+    PROFUNDIDADE_SONDAGEM níveis), e a busca continua pela que tem menos.
+
+    Com `processos` > 1 a árvore é aberta até haver subárvores suficientes, que são divididas
+    entre um pool de processos compartilhando o melhor custo encontrado.
+    """
+
+    def __init__(self, pqc: PQA, processos: int = 1, tempo_limite: float = None,
+                 custo_inicial: int = None, permutacao_inicial: List[int] = None,
+                 iteracoes_tabu: int = None, lote: int = LOTE_NOS, rng=None):
+        self.pqc = pqc
+        self.processos = processos
+        self.tempo_limite = tempo_limite
+        self.custo_inicial = custo_inicial
+        self.permutacao_inicial = permutacao_inicial
+        self.iteracoes_tabu = iteracoes_tabu if iteracoes_tabu is not None else 100 * pqc.n
+        self.lote = lote
+        self.rng = rng
+
+        self.melhor_custo = None
+        self.nos = 0
+        self.tempo = None
+        self.otimo_comprovado = False
+
+    def _incumbente(self) -> Tuple[int, List[int]]:
+        if self.permutacao_inicial is not None:
+            return self.pqc.calcular_custo(self.permutacao_inicial), list(self.permutacao_inicial)
+        if self.custo_inicial is not None:
+            return self.custo_inicial, None  # Só o valor: a busca precisa encontrar algo estritamente melhor
+        tabu = BuscaTabuRobusta(self.pqc, max_iteracoes=self.iteracoes_tabu, rng=self.rng)
+        permutacao = tabu.executar()
+        return tabu.melhor_custo, permutacao
+
+    def _abrir(self, instancia: _Instancia, nos: Tuple[np.ndarray, ...], melhor_custo: int,
+               profundidade: int, minimo: int = 0, prazo: float = None) -> Tuple[np.ndarray, ...]:
+        """Expande `nos` nível a nível até a `profundidade` e ao menos `minimo` nós (ou a véspera das folhas)."""
+        while len(nos[0]) and nos[0].shape[1] < instancia.n - 2 and \
+                (nos[0].shape[1] < profundidade or len(nos[0]) < minimo) and \
+                (prazo is None or time.time() < prazo):
+            nos = instancia.expandir(*nos, melhor_custo)
+            self.nos += len(nos[0])
+        return nos
+
+    def executar(self) -> List[int]:
+        inicio = time.perf_counter()
+        prazo = time.time() + self.tempo_limite if self.tempo_limite is not None else None
+        melhor_custo, melhor_permutacao = self._incumbente()
+        self.nos = 0
+
+        sondagens = [(_Instancia(self.pqc, trocar_papeis), _raiz(self.pqc.n)) for trocar_papeis in (False, True)]
+        for profundidade in range(1, PROFUNDIDADE_SONDAGEM + 1):
+            sondagens = [(instancia, self._abrir(instancia, nos, melhor_custo, profundidade, prazo=prazo))
+                         for instancia, nos in sondagens]
+            vivos = sorted(len(nos[0]) for _, nos in sondagens)
+            if 2 * vivos[0] <= vivos[1]:
+                break
+        instancia, nos = min(sondagens, key=lambda sondagem: len(sondagem[1][0]))
+
+        if self.processos is None or self.processos > 1:
+            processos = self.processos or os.cpu_count()
+            nos = self._abrir(instancia, nos, melhor_custo, 0, 16 * processos, prazo)
+            # Tarefas intercaladas por limitante: cada uma recebe nós promissores e ruins
+            ordem = np.argsort(nos[2], kind='stable')
+            tarefas = [tuple(x[ordem[k::4 * processos]] for x in nos) for k in range(min(4 * processos, len(ordem)))]
+            limite = mp.Value('q', melhor_custo)
+            with ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_trabalhador,
+                                     initargs=(instancia, limite)) as executor:
+                resultados = list(executor.map(_explorar_trabalhador, tarefas, [melhor_custo] * len(tarefas),
+                                               [prazo] * len(tarefas), [self.lote] * len(tarefas)))
+        else:
+            resultados = [_explorar(instancia, nos, melhor_custo, prazo, self.lote)]
+
+        self.otimo_comprovado = True
+        for custo, prefixo, abertos, completa in resultados:
+            self.nos += abertos
+            self.otimo_comprovado &= completa
+            if prefixo is not None and custo < melhor_custo:
+                melhor_custo, melhor_permutacao = custo, instancia.permutacao(prefixo)
+        self.melhor_custo = melhor_custo
+        self.tempo = time.perf_counter() - inicio
+        return melhor_permutacao
+
+
+def chave_instancia(pqc: PQA) -> str:
+    """Identificador da instância pelo conteúdo das matrizes (independe do tipo compacto usado)."""
+    resumo = hashlib.sha1()
+    for matriz in (pqc.distancias, pqc.fluxo):
+        resumo.update(np.ascontiguousarray(matriz, dtype=np.int64).tobytes())
+    return f"n{pqc.n}-{resumo.hexdigest()}"
+
+
+# Ótimos já conhecidos neste processo, por chave_instancia
+_otimos: Dict[str, Tuple[int, List[int]]] = {}
+
+
+def otimo(pqc: PQA, caminho_cache: str = None, processos: int = 1) -> Tuple[int, List[int]]:
+    """
+    (custo ótimo, permutação ótima) da instância, resolvida por BranchAndBound uma única vez:
+    o resultado fica em memória e, com `caminho_cache`, em um diário JSON (uma linha por
+    instância) lido pelas próximas execuções, para que as varreduras reportem o gap real.
+    """
+    chave = chave_instancia(pqc)
+    if chave not in _otimos and caminho_cache is not None and os.path.exists(caminho_cache):
+        for entrada in Diario(caminho_cache).concluidas():
+            _otimos[entrada["chave"]] = (entrada["custo"], entrada["permutacao"])
+    if chave not in _otimos:
+        solucionador = BranchAndBound(pqc, processos=processos)
+        permutacao = solucionador.executar()
+        _otimos[chave] = (solucionador.melhor_custo, permutacao)
+        if caminho_cache is not None:
+            Diario(caminho_cache).registrar({"chave": chave, "n": pqc.n, "custo": solucionador.melhor_custo,
+                                             "permutacao": permutacao})
+    return _otimos[chave]
+
+
+def forca_bruta(pqc: PQA) -> int:
+    """Custo ótimo por enumeração de todas as n! permutações (só para n <= ~10)."""
+    todas = np.array(list(itertools.permutations(range(pqc.n))))
+    return int(pqc.calcular_custos(todas).min())
+
+
+def verificar_forca_bruta(tamanhos=range(3, 10), sementes=range(200, 206), processos=(1, 2, 4)) -> List[str]:
+    """
+    Confere BranchAndBound contra forca_bruta em instâncias aleatórias pequenas, em série e com
+    processos. O incumbente inicial é inalcançável (custo_inicial=10**9), então toda permutação
+    ótima vem da árvore, e com processos os trabalhadores disputam o limite compartilhado.
+    Retorna as divergências: custo diferente do ótimo ou permutação que não tem o custo informado.
+    """
+    falhas = []
+    for n in tamanhos:
+        for semente in sementes:
+            pqc = PQA(n, seed=semente)
+            esperado = forca_bruta(pqc)
+            for quantidade in processos:
+                solucionador = BranchAndBound(pqc, processos=quantidade, custo_inicial=10 ** 9)
+                permutacao = solucionador.executar()
+                real = pqc.calcular_custo(permutacao) if permutacao is not None else None
+                if solucionador.melhor_custo != esperado or real != esperado:
+                    falhas.append(f"n={n} semente={semente} processos={quantidade}: ótimo {esperado}, "
+                                  f"informado {solucionador.melhor_custo}, permutação {real}")
+    return falhas
+
+
+if __name__ == "__main__":
+    # python exato.py: verificação contra força bruta (n <= 9, em série e com processos)
+    falhas = verificar_forca_bruta()
+    print("\n".join(falhas) or "BranchAndBound confere com a força bruta")
+    sys.exit(1 if falhas else 0)
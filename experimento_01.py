@@ -1,41 +1,24 @@
 # -*- coding: utf-8 -*-
-import datetime
-import csv
-import os
 import time
 import statistics
+import numpy as np
 from pqa import PQA
 from algoritmo_genetico import AlgoritmoGenetico
+from armazem import ArmazemResultados
+from telemetria import TelemetriaMemoria
 from config import *
 
-def salvar_dados_experimento(parte, nome_experimento, dados):
-    """
-    Salva os dados do experimento em um arquivo CSV dentro da pasta correspondente à parte.
-    """
-    pasta = f"resultados/{parte}"
-    os.makedirs(pasta, exist_ok=True)
-    
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    nome_arquivo = f"{pasta}/{nome_experimento}_{timestamp}.csv"
-    
-    fieldnames = ["execucao", "metodo_selecao", "melhor_individuo", "fitness"]
-    with open(nome_arquivo, mode="w", newline="") as arquivo_csv:
-        escritor = csv.DictWriter(arquivo_csv, fieldnames=fieldnames)
-        escritor.writeheader()
-        for item in dados:
-            escritor.writerow(item)
-    
-    print(f"Dados salvos em: {nome_arquivo}")
-
-def executar_experimento(pqc, metodo_selecao):
+def executar_experimento(pqc, metodo_selecao, armazem):
     """
     Executa um experimento comparando diferentes métodos de seleção.
     """
     resultados = []
     
+    fluxos = np.random.default_rng(SEED).spawn(20)  # Um fluxo aleatório independente por execução
     for i in range(20):  # Executar 20 vezes
-        ag = AlgoritmoGenetico(
-            pqc=pqc,
+        telemetria = TelemetriaMemoria(MAX_GERACOES + 1)  # Traço do melhor custo por geração
+        inicio = time.time()
+        parametros = dict(
             tamanho_populacao=TAMANHO_POPULACAO,
             max_geracoes=MAX_GERACOES,
             taxa_mutacao=TAXA_MUTACAO,
@@ -45,9 +28,13 @@ def executar_experimento(pqc, metodo_selecao):
             metodo_elitismo='top',
             metodo_mutacao='swap'
         )
+        ag = AlgoritmoGenetico(pqc=pqc, rng=fluxos[i], telemetria=telemetria, **parametros)
         
         melhor_solucao = ag.executar()
         fitness = pqc.calcular_custo(melhor_solucao)
+        armazem.adicionar(config={"experimento": "parte_1_selecao", "repeticao": i, **parametros},
+                          n=pqc.n, custo=fitness, tempo=time.time() - inicio, semente=SEED,
+                          traco=telemetria.registros()["melhor"])
         
         resultados.append({
             "execucao": i + 1,
@@ -60,16 +47,17 @@ def executar_experimento(pqc, metodo_selecao):
 
 def main():
     pqc = PQA(n=N, seed=SEED)  # Alterado para usar N do config.py
+    armazem = ArmazemResultados(ARQUIVO_RESULTADOS)
     
     print("\n=== EXECUTANDO EXPERIMENTO - COMPARAÇÃO DE SELEÇÃO ===")
     
     # Executar experimentos com os métodos de seleção 'torneio' e 'roleta'
-    resultados_torneio = executar_experimento(pqc, 'torneio')
-    resultados_roleta = executar_experimento(pqc, 'roleta')
+    resultados_torneio = executar_experimento(pqc, 'torneio', armazem)
+    resultados_roleta = executar_experimento(pqc, 'roleta', armazem)
     
     # Salvar resultados
-    salvar_dados_experimento("parte_1_selecao", "selecao_torneio", resultados_torneio)
-    salvar_dados_experimento("parte_1_selecao", "selecao_roleta", resultados_roleta)
+    armazem.fechar()
+    print(f"Dados salvos em: {ARQUIVO_RESULTADOS}")
 
     # Análise estatística (trecho adicionado)
     custos_torneio = [r["fitness"] for r in resultados_torneio]
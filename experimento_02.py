@@ -1,34 +1,20 @@
-import datetime
-import csv
-import os
+import time
 from statistics import mean, stdev
+import numpy as np
 from pqa import PQA
 from algoritmo_genetico import AlgoritmoGenetico
+from armazem import ArmazemResultados
+from telemetria import TelemetriaMemoria
 from config import *
 
 
-def salvar_dados_experimento(parte, nome_experimento, dados):
-    pasta = f"resultados/{parte}"
-    os.makedirs(pasta, exist_ok=True)
-
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    nome_arquivo = f"{pasta}/{nome_experimento}_{timestamp}.csv"
-
-    fieldnames = ["execucao", "metodo_crossover", "melhor_custo"]  # Padronizado para 'custo'
-    with open(nome_arquivo, mode="w", newline="") as arquivo_csv:
-        escritor = csv.DictWriter(arquivo_csv, fieldnames=fieldnames)
-        escritor.writeheader()
-        for item in dados:
-            escritor.writerow(item)
-
-    print(f"Dados salvos em: {nome_arquivo}")
-
-
-def executar_experimento_crossover(pqc, metodo_crossover):
+def executar_experimento_crossover(pqc, metodo_crossover, armazem):
     resultados = []
+    fluxos = np.random.default_rng(SEED).spawn(20)  # Um fluxo aleatório independente por execução
     for i in range(20):  # 20 execuções para consistência estatística
-        ag = AlgoritmoGenetico(
-            pqc=pqc,
+        telemetria = TelemetriaMemoria(MAX_GERACOES + 1)  # Traço do melhor custo por geração
+        inicio = time.time()
+        parametros = dict(
             tamanho_populacao=TAMANHO_POPULACAO,
             max_geracoes=MAX_GERACOES,
             taxa_mutacao=TAXA_MUTACAO,
@@ -39,8 +25,12 @@ def executar_experimento_crossover(pqc, metodo_crossover):
             metodo_mutacao='swap',
             pmx_retorna_um_filho=True if metodo_crossover == 'pmx' else False
         )
+        ag = AlgoritmoGenetico(pqc=pqc, rng=fluxos[i], telemetria=telemetria, **parametros)
         melhor_solucao = ag.executar()
         custo = pqc.calcular_custo(melhor_solucao)  # Padronizado para 'custo'
+        armazem.adicionar(config={"experimento": "parte_2_crossover", "repeticao": i, **parametros},
+                          n=pqc.n, custo=custo, tempo=time.time() - inicio, semente=SEED,
+                          traco=telemetria.registros()["melhor"])
         resultados.append({
             "execucao": i + 1,
             "metodo_crossover": metodo_crossover,
@@ -51,13 +41,14 @@ def executar_experimento_crossover(pqc, metodo_crossover):
 
 def main():
     pqc = PQA(n=N, seed=SEED)  # Usar 'N' de config.py (como no experimento_03)
+    armazem = ArmazemResultados(ARQUIVO_RESULTADOS)
     print("\n=== EXECUTANDO EXPERIMENTO - COMPARAÇÃO DE MÉTODOS DE CROSSOVER ===")
 
-    resultados_ox = executar_experimento_crossover(pqc, 'ox')
-    resultados_pmx = executar_experimento_crossover(pqc, 'pmx')
+    resultados_ox = executar_experimento_crossover(pqc, 'ox', armazem)
+    resultados_pmx = executar_experimento_crossover(pqc, 'pmx', armazem)
 
-    salvar_dados_experimento("parte_2_crossover", "crossover_ox", resultados_ox)
-    salvar_dados_experimento("parte_2_crossover", "crossover_pmx", resultados_pmx)
+    armazem.fechar()
+    print(f"Dados salvos em: {ARQUIVO_RESULTADOS}")
 
     custos_ox = [r["melhor_custo"] for r in resultados_ox]
     custos_pmx = [r["melhor_custo"] for r in resultados_pmx]
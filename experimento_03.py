@@ -1,35 +1,21 @@
 # -*- coding: utf-8 -*-
 # experimento_03.py
-import datetime
-import csv
-import os
 import time
 from statistics import mean, stdev
+import numpy as np
 from pqa import PQA
 from algoritmo_genetico import AlgoritmoGenetico
+from armazem import ArmazemResultados
+from telemetria import TelemetriaMemoria
 from config import *
 
-def salvar_dados_experimento(parte, nome_experimento, dados):
-    pasta = f"resultados/{parte}"
-    os.makedirs(pasta, exist_ok=True)
-
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    nome_arquivo = f"{pasta}/{nome_experimento}_{timestamp}.csv"
-
-    fieldnames = ["execucao", "metodo_elitismo", "melhor_custo"]
-    with open(nome_arquivo, mode="w", newline="", encoding='utf-8') as arquivo_csv:
-        escritor = csv.DictWriter(arquivo_csv, fieldnames=fieldnames)
-        escritor.writeheader()
-        for item in dados:
-            escritor.writerow(item)
-
-    print(f"Dados salvos em: {nome_arquivo}")
-
-def executar_experimento_elitismo(pqc, metodo_elitismo):
+def executar_experimento_elitismo(pqc, metodo_elitismo, armazem):
     resultados = []
+    fluxos = np.random.default_rng(SEED).spawn(20)  # Um fluxo aleatório independente por execução
     for i in range(20):
-        ag = AlgoritmoGenetico(
-            pqc=pqc,
+        telemetria = TelemetriaMemoria(MAX_GERACOES + 1)  # Traço do melhor custo por geração
+        inicio = time.time()
+        parametros = dict(
             tamanho_populacao=TAMANHO_POPULACAO,
             max_geracoes=MAX_GERACOES,
             taxa_mutacao=TAXA_MUTACAO,
@@ -39,18 +25,23 @@ def executar_experimento_elitismo(pqc, metodo_elitismo):
             metodo_elitismo=metodo_elitismo,
             metodo_mutacao='swap'
         )
+        ag = AlgoritmoGenetico(pqc=pqc, rng=fluxos[i], telemetria=telemetria, **parametros)
         melhor_solucao = ag.executar()
         custo = pqc.calcular_custo(melhor_solucao)
+        armazem.adicionar(config={"experimento": "parte_3_elitismo", "repeticao": i, **parametros},
+                          n=pqc.n, custo=custo, tempo=time.time() - inicio, semente=SEED,
+                          traco=telemetria.registros()["melhor"])
         resultados.append({"execucao": i + 1, "metodo_elitismo": metodo_elitismo, "melhor_custo": custo})
     return resultados
 
 def main():
     pqc = PQA(n=N, seed=SEED)
+    armazem = ArmazemResultados(ARQUIVO_RESULTADOS)
     print("\n=== EXECUTANDO EXPERIMENTO - COMPARAÇÃO DE ELITISMO ===")
-    resultados_top = executar_experimento_elitismo(pqc, 'top')
-    resultados_hibrido = executar_experimento_elitismo(pqc, 'hibrido')
-    salvar_dados_experimento("parte_3_elitismo", "elitismo_top", resultados_top)
-    salvar_dados_experimento("parte_3_elitismo", "elitismo_hibrido", resultados_hibrido)
+    resultados_top = executar_experimento_elitismo(pqc, 'top', armazem)
+    resultados_hibrido = executar_experimento_elitismo(pqc, 'hibrido', armazem)
+    armazem.fechar()
+    print(f"Dados salvos em: {ARQUIVO_RESULTADOS}")
 
     custos_top = [r["melhor_custo"] for r in resultados_top]
     custos_hibrido = [r["melhor_custo"] for r in resultados_hibrido]
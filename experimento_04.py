@@ -1,34 +1,20 @@
-import datetime
-import csv
-import os
+import time
 from statistics import mean, stdev
+import numpy as np
 from pqa import PQA
 from algoritmo_genetico import AlgoritmoGenetico
+from armazem import ArmazemResultados
+from telemetria import TelemetriaMemoria
 from config import *
 
 
-def salvar_dados_experimento(parte, nome_experimento, dados):
-    pasta = f"resultados/{parte}"
-    os.makedirs(pasta, exist_ok=True)
-
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    nome_arquivo = f"{pasta}/{nome_experimento}_{timestamp}.csv"
-
-    fieldnames = ["execucao", "metodo_mutacao", "melhor_custo"]  # Campo alterado para 'custo'
-    with open(nome_arquivo, mode="w", newline="") as arquivo_csv:
-        escritor = csv.DictWriter(arquivo_csv, fieldnames=fieldnames)
-        escritor.writeheader()
-        for item in dados:
-            escritor.writerow(item)
-
-    print(f"Dados salvos em: {nome_arquivo}")
-
-
-def executar_experimento_mutacao(pqc, metodo_mutacao):
+def executar_experimento_mutacao(pqc, metodo_mutacao, armazem):
     resultados = []
+    fluxos = np.random.default_rng(SEED).spawn(20)  # Um fluxo aleatório independente por execução
     for i in range(20):  # 20 execuções para consistência estatística
-        ag = AlgoritmoGenetico(
-            pqc=pqc,
+        telemetria = TelemetriaMemoria(MAX_GERACOES + 1)  # Traço do melhor custo por geração
+        inicio = time.time()
+        parametros = dict(
             tamanho_populacao=TAMANHO_POPULACAO,
             max_geracoes=MAX_GERACOES,
             taxa_mutacao=TAXA_MUTACAO,
@@ -38,8 +24,12 @@ def executar_experimento_mutacao(pqc, metodo_mutacao):
             metodo_elitismo='top',      # Elitismo fixo
             metodo_mutacao=metodo_mutacao  # Variável (swap/inversao)
         )
+        ag = AlgoritmoGenetico(pqc=pqc, rng=fluxos[i], telemetria=telemetria, **parametros)
         melhor_solucao = ag.executar()
         custo = pqc.calcular_custo(melhor_solucao)  # Usar custo diretamente
+        armazem.adicionar(config={"experimento": "parte_4_mutacao", "repeticao": i, **parametros},
+                          n=pqc.n, custo=custo, tempo=time.time() - inicio, semente=SEED,
+                          traco=telemetria.registros()["melhor"])
         resultados.append({
             "execucao": i + 1,
             "metodo_mutacao": metodo_mutacao,
@@ -50,13 +40,14 @@ def executar_experimento_mutacao(pqc, metodo_mutacao):
 
 def main():
     pqc = PQA(n=N, seed=SEED)  # Usar 'N' de config.py
+    armazem = ArmazemResultados(ARQUIVO_RESULTADOS)
     print("\n=== EXECUTANDO EXPERIMENTO - COMPARAÇÃO DE MÉTODOS DE MUTAÇÃO ===")
 
-    resultados_swap = executar_experimento_mutacao(pqc, 'swap')
-    resultados_inversao = executar_experimento_mutacao(pqc, 'inversao')
+    resultados_swap = executar_experimento_mutacao(pqc, 'swap', armazem)
+    resultados_inversao = executar_experimento_mutacao(pqc, 'inversao', armazem)
 
-    salvar_dados_experimento("parte_4_mutacao", "mutacao_swap", resultados_swap)
-    salvar_dados_experimento("parte_4_mutacao", "mutacao_inversao", resultados_inversao)
+    armazem.fechar()
+    print(f"Dados salvos em: {ARQUIVO_RESULTADOS}")
 
     custos_swap = [r["melhor_custo"] for r in resultados_swap]
     custos_inversao = [r["melhor_custo"] for r in resultados_inversao]
@@ -1,49 +1,35 @@
-import datetime
-import csv
-import os
 import time
 from statistics import mean, stdev
 from pqa import PQA
 from algoritmo_genetico import AlgoritmoGenetico
+from armazem import ArmazemResultados
+from telemetria import TelemetriaMemoria
 from config import *  # Certifique-se de que este arquivo contém as configurações padrão
 
 
-def salvar_dados_experimento_tamanho(nome_experimento, dados):
+def executar_variacao(pqc, variacao_nome, parametros, armazem):
     """
-    Salva os dados do experimento de tamanho em um arquivo CSV.
-    """
-    pasta = "resultados/parte_5_tamanho"
-    os.makedirs(pasta, exist_ok=True)
-
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    nome_arquivo = f"{pasta}/{nome_experimento}_{timestamp}.csv"
-
-    fieldnames = ["tamanho_entrada", "variacao", "tempo_execucao", "melhor_fitness"]  # Adicionado melhor_fitness
-    with open(nome_arquivo, mode="w", newline="") as arquivo_csv:
-        escritor = csv.DictWriter(arquivo_csv, fieldnames=fieldnames)
-        escritor.writeheader()
-        for item in dados:
-            escritor.writerow(item)
-
-    print(f"Dados salvos em: {nome_arquivo}")
-
-
-def executar_variacao(pqc, variacao_nome, parametros):
-    """
-    Executa uma variação do algoritmo genético e retorna o tempo de execução.
+    Executa uma variação do algoritmo genético, registra a execução no armazém e
+    retorna o tempo de execução.
     """
+    telemetria = TelemetriaMemoria(parametros["max_geracoes"] + 1)
     inicio = time.time()
-    ag = AlgoritmoGenetico(pqc=pqc, **parametros)
+    ag = AlgoritmoGenetico(pqc=pqc, telemetria=telemetria, **parametros)
     melhor_solucao = ag.executar()
     fim = time.time()
     tempo_execucao = fim - inicio
-    fitness = 1 / (1 + pqc.calcular_custo(melhor_solucao))
+    custo = pqc.calcular_custo(melhor_solucao)
+    armazem.adicionar(config={"experimento": "parte_5_tamanho", "variacao": variacao_nome, **parametros},
+                      n=pqc.n, custo=custo, tempo=tempo_execucao, semente=SEED,
+                      traco=telemetria.registros()["melhor"])
+    fitness = 1 / (1 + custo)
     return tempo_execucao, fitness
 
 
 def main():
     tamanhos_entrada = range(10, 21, 1)  # Incrementa n de 10 a 20 (inclusive)
     resultados = []
+    armazem = ArmazemResultados(ARQUIVO_RESULTADOS)
 
     # Defina as 4 variações campeãs aqui.  Adaptar os parâmetros conforme necessário.
     variacoes = {
@@ -98,7 +84,7 @@ def main():
         for variacao_nome, parametros in variacoes.items():
             print(f"  Executando variação: {variacao_nome}")
             try:
-                tempo_execucao, fitness = executar_variacao(pqc, variacao_nome, parametros)  # Recebe fitness
+                tempo_execucao, fitness = executar_variacao(pqc, variacao_nome, parametros, armazem)  # Recebe fitness
 
                 resultados.append({
                     "tamanho_entrada": n,
@@ -111,7 +97,8 @@ def main():
                 print(f"    Erro durante a execução da variação {variacao_nome}: {e}")
 
 
-    salvar_dados_experimento_tamanho("experimento_tamanho_entrada", resultados)
+    armazem.fechar()
+    print(f"Dados salvos em: {ARQUIVO_RESULTADOS}")
 
     print("\nExperimento concluído. Dados salvos com sucesso.")
 
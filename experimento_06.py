@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# experimento_06.py
+import time
+from statistics import mean, median
+import numpy as np
+from pqa import PQA
+from algoritmo_genetico import AlgoritmoGenetico
+from busca_tabu import BuscaTabuRobusta
+from armazem import ArmazemResultados
+from config import *
+
+TAMANHOS_N = [20, 30, 50]
+REPETICOES = 10
+TEMPO_MAXIMO = 30       # Tempo máximo (s) por execução até atingir o alvo
+TEMPO_PILOTO = 5        # Tempo (s) das execuções piloto que definem o alvo
+TOLERANCIA_ALVO = 0.01  # Alvo = melhor custo piloto + 1%
+
+
+def parametros_ag(tempo_limite):
+    return dict(
+        tamanho_populacao=TAMANHO_POPULACAO,
+        max_geracoes=10**9,  # Limitado pelo tempo
+        taxa_mutacao=TAXA_MUTACAO,
+        taxa_elitismo=TAXA_ELITISMO,
+        metodo_selecao='torneio',
+        metodo_crossover='ox',
+        metodo_elitismo='top',
+        metodo_mutacao='swap',
+        paciencia=None,
+        tempo_limite=tempo_limite,
+        intervalo_impressao=0
+    )
+
+
+def parametros_tabu(tempo_limite):
+    return dict(max_iteracoes=10**9, tempo_limite=tempo_limite)
+
+
+def criar_ag(pqc, rng, tempo_limite):
+    return AlgoritmoGenetico(pqc=pqc, rng=rng, **parametros_ag(tempo_limite))
+
+
+def tempo_ate_alvo_ag(pqc, rng, custo_alvo):
+    """Evolui o AG geração a geração até o melhor custo atingir o alvo (ou estourar TEMPO_MAXIMO)."""
+    ag = criar_ag(pqc, rng, TEMPO_MAXIMO)
+    inicio = time.perf_counter()
+    while True:
+        melhor_custo = int(ag.custos.min())
+        decorrido = time.perf_counter() - inicio
+        if melhor_custo <= custo_alvo or decorrido >= TEMPO_MAXIMO:
+            return melhor_custo <= custo_alvo, decorrido, melhor_custo
+        ag.proxima_geracao()
+
+
+def tempo_ate_alvo_tabu(pqc, rng, custo_alvo):
+    tabu = BuscaTabuRobusta(pqc, custo_alvo=custo_alvo, rng=rng, **parametros_tabu(TEMPO_MAXIMO))
+    inicio = time.perf_counter()
+    tabu.executar()
+    decorrido = time.perf_counter() - inicio
+    return tabu.melhor_custo <= custo_alvo, decorrido, tabu.melhor_custo
+
+
+def definir_alvo(pqc, rng):
+    """Alvo comum aos dois solvers: melhor custo de execuções piloto curtas de ambos, com tolerância."""
+    fluxos = rng.spawn(2)
+    ag = criar_ag(pqc, fluxos[0], TEMPO_PILOTO)
+    ag.executar()
+    tabu = BuscaTabuRobusta(pqc, rng=fluxos[1], **parametros_tabu(TEMPO_PILOTO))
+    tabu.executar()
+    melhor_piloto = min(int(ag.custos.min()), tabu.melhor_custo)
+    return int(melhor_piloto * (1 + TOLERANCIA_ALVO))
+
+
+def main():
+    print("\n=== EXECUTANDO EXPERIMENTO - AG vs BUSCA TABU ROBUSTA (TEMPO ATÉ O ALVO) ===")
+    rng = np.random.default_rng(SEED)
+    resultados = []
+    armazem = ArmazemResultados(ARQUIVO_RESULTADOS)
+
+    for n in TAMANHOS_N:
+        pqc = PQA(n=n, seed=rng.spawn(1)[0])
+        custo_alvo = definir_alvo(pqc, rng.spawn(1)[0])
+        print(f"\nTamanho n={n} | Custo alvo: {custo_alvo}")
+
+        fluxos = rng.spawn(2 * REPETICOES)
+        for i in range(REPETICOES):
+            for solver, medir, fluxo, parametros in (
+                    ("AG", tempo_ate_alvo_ag, fluxos[2 * i], parametros_ag(TEMPO_MAXIMO)),
+                    ("RoTS", tempo_ate_alvo_tabu, fluxos[2 * i + 1], parametros_tabu(TEMPO_MAXIMO))):
+                atingiu, tempo, melhor_custo = medir(pqc, fluxo, custo_alvo)
+                resultados.append({
+                    "execucao": i + 1,
+                    "solver": solver,
+                    "tamanho_entrada": n,
+                    "custo_alvo": custo_alvo,
+                    "atingiu_alvo": atingiu,
+                    "tempo_ate_alvo": tempo,
+                    "melhor_custo": melhor_custo
+                })
+                armazem.adicionar(config={"experimento": "parte_6_tabu", "repeticao": i, "solver": solver,
+                                          "custo_alvo": custo_alvo, "atingiu_alvo": atingiu, **parametros},
+                                  n=n, custo=melhor_custo, tempo=tempo, semente=SEED)
+
+        for solver in ("AG", "RoTS"):
+            execucoes = [r for r in resultados if r["solver"] == solver and r["tamanho_entrada"] == n]
+            sucessos = [r["tempo_ate_alvo"] for r in execucoes if r["atingiu_alvo"]]
+            tempo_mediano = f"{median(sucessos):.2f}s" if sucessos else "-"
+            print(f"  {solver:4s} | Atingiu o alvo: {len(sucessos)}/{len(execucoes)} | "
+                  f"Tempo mediano até o alvo: {tempo_mediano} | "
+                  f"Custo médio final: {mean(r['melhor_custo'] for r in execucoes):.1f}")
+
+    armazem.fechar()
+    print(f"Dados salvos em: {ARQUIVO_RESULTADOS}")
+    print("\nExperimento concluído. Dados salvos com sucesso.")
+
+
+if __name__ == "__main__":
+    main()
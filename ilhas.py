@@ -0,0 +1,124 @@
+# ilhas.py
+import multiprocessing as mp
+import signal
+import sys
+import numpy as np
+from typing import Dict, List
+from pqa import PQA
+from algoritmo_genetico import AlgoritmoGenetico
+
+# Parâmetros do AG que só `executar` usa: as ilhas evoluem por `passo`, então eles não teriam efeito
+PARAMETROS_SEM_EFEITO = ('paciencia', 'tempo_limite', 'max_avaliacoes', 'gap_alvo', 'caminho_checkpoint', 'telemetria')
+
+
+def _executar_ilha(conexao, pqc: PQA, parametros: Dict, max_geracoes: int,
+                   intervalo_migracao: int, n_migrantes: int, semente: np.random.SeedSequence):
+    """
+    Laço de um processo-ilha: evolui `intervalo_migracao` gerações, envia seus melhores
+    indivíduos ao coordenador, recebe os imigrantes e repete. No fim envia o melhor encontrado.
+    """
+    # O coordenador encerra as ilhas com terminate (SIGTERM): vira SystemExit para o `finally`
+    # liberar o avaliador, em vez de deixar órfãos os processos do pool
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(1))
+    ag = AlgoritmoGenetico(pqc=pqc, max_geracoes=max_geracoes, rng=np.random.default_rng(semente), **parametros)
+    try:
+        geracao = 0
+        while geracao < max_geracoes:
+            passos = min(intervalo_migracao, max_geracoes - geracao)
+            for _ in range(passos):
+                ag.passo()
+            geracao += passos
+
+            if geracao < max_geracoes:
+                conexao.send(ag.melhores(n_migrantes))
+                individuos, custos = conexao.recv()
+                ag.inserir_imigrantes(individuos, custos)
+
+        individuos, custos = ag.melhores(1)
+        conexao.send((individuos[0], int(custos[0])))
+    finally:
+        ag.fechar()  # Só `passo` é usado: o pool do avaliador ('threads'/'processos') é liberado aqui
+        conexao.close()
+
+
+class ModeloIlhas:
+    """
+    AG em modelo de ilhas: cada configuração de `configuracoes` (parâmetros do
+    AlgoritmoGenetico, exceto pqc, max_geracoes e rng) roda em um processo separado.
+    A cada `intervalo_migracao` gerações cada ilha envia seus `n_migrantes` melhores
+    indivíduos para outra ilha, que substitui seus piores por eles. Cada ilha roda exatamente
+    `max_geracoes` gerações: os parâmetros de PARAMETROS_SEM_EFEITO (critérios de parada,
+    checkpoint e telemetria de `executar`) são recusados em vez de ignorados.
+
+    As ilhas não são processos daemon, então podem usar avaliador='processos' (um pool por ilha).
+
+    Topologias:
+      - 'anel': a ilha i recebe da ilha i - 1.
+      - 'aleatoria': a cada migração cada ilha recebe de outra ilha sorteada.
+    """
+
+    def __init__(self, pqc: PQA, configuracoes: List[Dict], max_geracoes: int,
+                 intervalo_migracao: int = 20, n_migrantes: int = 2,
+                 topologia: str = 'anel', semente=None):
+        if topologia not in ('anel', 'aleatoria'):
+            raise ValueError(f"Topologia desconhecida: {topologia}")
+        if len(configuracoes) < 2:
+            raise ValueError("O modelo de ilhas precisa de pelo menos duas ilhas")
+        sem_efeito = sorted({nome for parametros in configuracoes for nome in PARAMETROS_SEM_EFEITO
+                             if parametros.get(nome) is not None})
+        if sem_efeito:
+            raise ValueError(f"Parâmetros sem efeito no modelo de ilhas: {', '.join(sem_efeito)}")
+
+        self.pqc = pqc
+        self.configuracoes = configuracoes
+        self.max_geracoes = max_geracoes
+        self.intervalo_migracao = intervalo_migracao
+        self.n_migrantes = n_migrantes
+        self.topologia = topologia
+        self.semente = np.random.SeedSequence(semente)
+        self.rng = np.random.default_rng(self.semente.spawn(1)[0])  # Sorteio da topologia aleatória
+        self.melhor_custo = None
+        self.custos_ilhas = []
+
+    def _origens(self, k: int) -> np.ndarray:
+        """origens[i] = ilha de onde a ilha i recebe imigrantes nesta migração."""
+        if self.topologia == 'anel':
+            return (np.arange(k) - 1) % k
+        return (np.arange(k) + self.rng.integers(1, k, k)) % k  # Nunca a própria ilha
+
+    def executar(self) -> List[int]:
+        k = len(self.configuracoes)
+        sementes = self.semente.spawn(k)
+        conexoes, processos = [], []
+        for parametros, semente in zip(self.configuracoes, sementes):
+            local, remota = mp.Pipe()
+            processo = mp.Process(target=_executar_ilha,
+                                  args=(remota, self.pqc, parametros, self.max_geracoes,
+                                        self.intervalo_migracao, self.n_migrantes, semente))
+            processo.start()
+            remota.close()
+            conexoes.append(local)
+            processos.append(processo)
+
+        try:
+            # Todas as ilhas migram nas mesmas gerações, então as épocas são síncronas
+            n_migracoes = (self.max_geracoes - 1) // self.intervalo_migracao
+            for _ in range(n_migracoes):
+                emigrantes = [conexao.recv() for conexao in conexoes]
+                for conexao, origem in zip(conexoes, self._origens(k)):
+                    conexao.send(emigrantes[origem])
+
+            resultados = [conexao.recv() for conexao in conexoes]
+        except BaseException:
+            # Uma ilha que falhou fecha seu pipe (EOFError); as demais ficariam esperando para sempre
+            for processo in processos:
+                processo.terminate()
+            raise
+        finally:
+            for processo in processos:
+                processo.join()
+
+        self.custos_ilhas = [custo for _, custo in resultados]
+        melhor = int(np.argmin(self.custos_ilhas))
+        self.melhor_custo = self.custos_ilhas[melhor]
+        return resultados[melhor][0].tolist()
@@ -0,0 +1,106 @@
+# instancias.py
+import os
+import numpy as np
+from typing import Dict, Tuple
+from pqa import PQA
+from checkpoint import salvar_npy_atomico
+
+# Arrays derivados gravados ao lado das matrizes; cada um é função apenas de (distancias, fluxo)
+DERIVADOS = {
+    # Fluxo não repetido (triângulo superior), usado por PQA.fluxo_triangular
+    "fluxo_triangular": lambda distancias, fluxo: np.triu(fluxo, k=1),
+    # Linhas sem a diagonal, ordenadas: fluxo crescente e distâncias decrescentes (limitantes de Gilmore-Lawler)
+    "fluxo_ordenado": lambda distancias, fluxo: np.sort(_sem_diagonal(fluxo), axis=1),
+    "distancias_ordenadas": lambda distancias, fluxo: -np.sort(-_sem_diagonal(distancias), axis=1),
+}
+
+
+def _sem_diagonal(matriz: np.ndarray) -> np.ndarray:
+    n = len(matriz)
+    return matriz[~np.eye(n, dtype=bool)].reshape(n, n - 1)
+
+
+def validar_matrizes(distancias: np.ndarray, fluxo: np.ndarray):
+    """
+    O custo (soma // 2) e os deltas do PQA supõem matrizes simétricas com diagonal nula;
+    instâncias assimétricas são rejeitadas em vez de produzirem custos errados.
+    """
+    for nome, matriz in (("distâncias", distancias), ("fluxo", fluxo)):
+        if not np.array_equal(matriz, matriz.T):
+            raise ValueError(f"Matriz de {nome} não é simétrica: instâncias assimétricas não são suportadas")
+        if np.any(np.diag(matriz) != 0):
+            raise ValueError(f"Diagonal da matriz de {nome} não é zero")
+
+
+def ler_qaplib(caminho: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lê um arquivo .dat da QAPLIB: n, seguido das matrizes A (fluxo) e B (distâncias).
+    Retorna (distancias, fluxo) em int64.
+
+    Atenção: a QAPLIB reporta a soma completa sum_ij a_ij * b_p(i)p(j), que é o dobro
+    do custo calculado por PQA.calcular_custo (cada par não ordenado conta uma vez).
+    """
+    with open(caminho, encoding="utf-8") as arquivo:
+        valores = np.array(arquivo.read().split(), dtype=np.int64)
+    n = int(valores[0])
+    if len(valores) < 1 + 2 * n * n:
+        raise ValueError(f"{caminho}: esperados {2 * n * n} valores para n={n}, encontrados {len(valores) - 1}")
+    fluxo = valores[1:1 + n * n].reshape(n, n)
+    distancias = valores[1 + n * n:1 + 2 * n * n].reshape(n, n)
+    validar_matrizes(distancias, fluxo)
+    return distancias, fluxo
+
+
+def salvar_instancia(pqc: PQA, caminho: str):
+    """
+    Grava a instância no formato binário: um diretório com distancias.npy, fluxo.npy
+    (nos tipos compactos da instância) e os arrays de DERIVADOS, todos legíveis via mmap.
+    """
+    os.makedirs(caminho, exist_ok=True)
+    np.save(os.path.join(caminho, "distancias.npy"), pqc.distancias)
+    np.save(os.path.join(caminho, "fluxo.npy"), pqc.fluxo)
+    for nome, calcular in DERIVADOS.items():
+        np.save(os.path.join(caminho, f"{nome}.npy"), calcular(pqc.distancias, pqc.fluxo))
+
+
+def converter_qaplib(origem: str, destino: str):
+    """Converte um .dat da QAPLIB para o formato binário."""
+    distancias, fluxo = ler_qaplib(origem)
+    salvar_instancia(PQA.de_matrizes(distancias, fluxo, compactar=True), destino)
+
+
+def _carregar_derivados(caminho: str, distancias: np.ndarray, fluxo: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Abre os derivados em mmap; os ausentes (ex.: adicionados depois) são calculados e gravados uma
+    vez. A gravação é atômica: vários processos carregando a mesma instância (cada trabalhador a
+    reabre pelo caminho) podem gravar o mesmo derivado ao mesmo tempo, e nenhum mapeia um .npy parcial.
+    """
+    derivados = {}
+    for nome, calcular in DERIVADOS.items():
+        arquivo = os.path.join(caminho, f"{nome}.npy")
+        if not os.path.exists(arquivo):
+            salvar_npy_atomico(arquivo, calcular(distancias, fluxo))
+        derivados[nome] = np.load(arquivo, mmap_mode="r")
+    return derivados
+
+
+def carregar_instancia(caminho: str) -> PQA:
+    """
+    Abre uma instância gravada por salvar_instancia. As matrizes são mapeadas em memória
+    (somente leitura): carregar é praticamente instantâneo e processos que abrem o mesmo
+    caminho compartilham as páginas do sistema operacional em vez de copiá-las.
+    """
+    distancias = np.load(os.path.join(caminho, "distancias.npy"), mmap_mode="r")
+    fluxo = np.load(os.path.join(caminho, "fluxo.npy"), mmap_mode="r")
+    derivados = _carregar_derivados(caminho, distancias, fluxo)
+    fluxo_triangular = derivados.pop("fluxo_triangular")
+    return PQA.de_matrizes(distancias, fluxo, fluxo_triangular, derivados, caminho=caminho)
+
+
+def carregar(caminho: str) -> PQA:
+    """Carrega um .dat da QAPLIB (em memória) ou um diretório no formato binário (mmap)."""
+    if os.path.isdir(caminho):
+        return carregar_instancia(caminho)
+    if caminho.endswith(".dat"):
+        return PQA.de_matrizes(*ler_qaplib(caminho), compactar=True)
+    raise ValueError(f"Formato de instância desconhecido: {caminho}")
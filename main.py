@@ -1,75 +1,71 @@
 # -*- coding: utf-8 -*-
-import datetime
-import csv
-import os
 import time
 import statistics
 from pqa import PQA
 from algoritmo_genetico import AlgoritmoGenetico
+from paralelo import executar_grade
+from armazem import ArmazemResultados
+from exato import otimo
 from config import *
 
-def salvar_dados_experimento(parte, nome_experimento, dados):
+def registrar_resultado(armazem, experimento, pqc, resultado, semente=None):
     """
-    Salva os dados do experimento em um arquivo CSV dentro da pasta correspondente à parte.
+    Anexa ao armazém uma execução devolvida por executar_grade.
     
     Parâmetros:
-      parte: Nome da parte do experimento (ex: "parte_1_selecao").
-      nome_experimento: Nome identificador para os dados (ex: "selecao").
-      dados: Lista de dicionários com os resultados.
+      experimento: Nome identificador do experimento (ex: "parte_1_selecao").
+      semente: Semente raiz da grade; a repetição identifica o fluxo filho.
     """
-    pasta = f"resultados/{parte}"
-    os.makedirs(pasta, exist_ok=True)
+    config = {"experimento": experimento, "repeticao": resultado["repeticao"], **resultado["parametros"]}
+    armazem.adicionar(config=config, n=pqc.n, custo=resultado["custo"], tempo=resultado["tempo"],
+                      semente=semente, traco=resultado["traco"])
     
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    nome_arquivo = f"{pasta}/{nome_experimento}_{timestamp}.csv"
-    
-    fieldnames = ["config", "custo", "tempo", "media", "desvio_padrao", "tempo_total"]
-    with open(nome_arquivo, mode="w", newline="") as arquivo_csv:
-        escritor = csv.DictWriter(arquivo_csv, fieldnames=fieldnames)
-        escritor.writeheader()
-        for item in dados:
-            escritor.writerow(item)
-    
-    print(f"Dados salvos em: {nome_arquivo}")
-    
-def testar_parametros():
-    """Executa testes variando parâmetros para encontrar configurações eficientes."""
+def testar_parametros(semente: int = 42, processos: int = None, armazem: ArmazemResultados = None,
+                      pasta_checkpoint: str = "resultados/checkpoints/parte_0_parametros"):
+    """
+    Executa testes variando parâmetros para encontrar configurações eficientes.
+    Com `pasta_checkpoint`, uma varredura interrompida retoma de onde parou (veja executar_grade).
+    """
     tamanhos_populacao = [50, 100, 200, 500]
     max_geracoes = [100, 200, 500]
     taxas_mutacao = [0.05, 0.1, 0.2]
     taxas_elitismo = [0.05, 0.1, 0.2]
 
+    configuracoes = [
+        {
+            "tamanho_populacao": pop,
+            "max_geracoes": gen,
+            "taxa_mutacao": mut,
+            "taxa_elitismo": elit,
+            "metodo_selecao": 'torneio',
+            "metodo_crossover": 'ox',
+            "metodo_elitismo": 'top',
+            "metodo_mutacao": 'swap'
+        }
+        for pop in tamanhos_populacao
+        for gen in max_geracoes
+        for mut in taxas_mutacao
+        for elit in taxas_elitismo
+    ]
+
     melhor_config = None
-    melhor_custo = float('inf')
-
-    for pop in tamanhos_populacao:
-        for gen in max_geracoes:
-            for mut in taxas_mutacao:
-                for elit in taxas_elitismo:
-                    pqc = PQA(n=10, seed=42)  # Tamanho fixo para experimentação
-                    ag = AlgoritmoGenetico(
-                        pqc=pqc,
-                        tamanho_populacao=pop,
-                        max_geracoes=gen,
-                        taxa_mutacao=mut,
-                        taxa_elitismo=elit,
-                        metodo_selecao='torneio',
-                        metodo_crossover='ox',
-                        metodo_elitismo='top',
-                        metodo_mutacao='swap'
-                    )
-
-                    inicio = time.time()
-                    solucao = ag.executar()
-                    custo = pqc.calcular_custo(solucao)
-                    tempo_execucao = time.time() - inicio
-
-                    print(
-                        f"População: {pop}, Gerações: {gen}, Mutação: {mut}, Elitismo: {elit} | Custo: {custo} | Tempo: {tempo_execucao:.2f}s")
-
-                    if custo < melhor_custo:
-                        melhor_custo = custo
-                        melhor_config = (pop, gen, mut, elit)
+    melhor = (float('inf'), None)  # (custo, índice) - o índice desempata de forma determinística
+
+    pqc = PQA(n=10, seed=42)  # Tamanho fixo para experimentação, compartilhado por todas as tarefas
+    custo_otimo, _ = otimo(pqc, ARQUIVO_OTIMOS)  # Resolvido uma vez (branch-and-bound) e reaproveitado do cache
+    for resultado in executar_grade(pqc, configuracoes, semente=semente, processos=processos,
+                                    pasta_checkpoint=pasta_checkpoint):
+        p = resultado["parametros"]
+        custo = resultado["custo"]
+        if armazem is not None and not resultado.get("retomado"):  # Retomados já foram registrados
+            # adicionar já grava a execução em disco (diário de pendentes) antes de a tarefa entrar no diário da grade
+            registrar_resultado(armazem, "parte_0_parametros", pqc, resultado, semente)
+        print(
+            f"População: {p['tamanho_populacao']}, Gerações: {p['max_geracoes']}, Mutação: {p['taxa_mutacao']}, Elitismo: {p['taxa_elitismo']} | Custo: {custo} | Gap: {(custo - custo_otimo) / custo_otimo:.2%} | Tempo: {resultado['tempo']:.2f}s")
+
+        if (custo, resultado["indice"]) < melhor:
+            melhor = (custo, resultado["indice"])
+            melhor_config = (p['tamanho_populacao'], p['max_geracoes'], p['taxa_mutacao'], p['taxa_elitismo'])
 
     print("\nMelhor configuração encontrada:")
     print(
@@ -93,61 +89,65 @@ def testar_tamanho_maximo():
             metodo_selecao='torneio',
             metodo_crossover='ox',
             metodo_elitismo='top',
-            metodo_mutacao='swap'
+            metodo_mutacao='swap',
+            paciencia=None,  # Mede o custo das 100 gerações completas
+            tempo_limite=tempo_limite  # Interrompe a execução assim que o limite é atingido
         )
 
         inicio = time.time()
         ag.executar()
         tempo_execucao = time.time() - inicio
 
-        print(f"Tamanho n={n} | Tempo: {tempo_execucao:.2f}s")
+        print(f"Tamanho n={n} | Tempo: {tempo_execucao:.2f}s | Gerações: {ag.geracoes_executadas}")
 
-        if tempo_execucao > tempo_limite:
+        if ag.motivo_parada == 'tempo_limite':
             print(f"\nTamanho máximo viável identificado: {n // 2}")
             break
 
-def executar_experimento(pqc, metodo_selecao, metodo_crossover, metodo_elitismo, metodo_mutacao, pmx_retorna_um_filho=False):
-    tempos_execucao = []
-    custos = []
-    
-    for _ in range(5):
-        inicio = time.time()
-        
-        ag = AlgoritmoGenetico(
-            pqc=pqc,
-            tamanho_populacao=TAMANHO_POPULACAO,
-            max_geracoes=MAX_GERACOES,
-            taxa_mutacao=TAXA_MUTACAO,
-            taxa_elitismo=TAXA_ELITISMO,
-            metodo_selecao=metodo_selecao,
-            metodo_crossover=metodo_crossover,
-            metodo_elitismo=metodo_elitismo,
-            metodo_mutacao=metodo_mutacao,
-            pmx_retorna_um_filho=pmx_retorna_um_filho
-        )
-
-        melhor_solucao = ag.executar()
-        custo = pqc.calcular_custo(melhor_solucao)
-        tempo_execucao = time.time() - inicio
-        
-        custos.append(custo)
-        tempos_execucao.append(tempo_execucao)
+def executar_experimento(pqc, metodo_selecao, metodo_crossover, metodo_elitismo, metodo_mutacao, pmx_retorna_um_filho=False,
+                         semente=None, processos=None, armazem=None, experimento=None, pasta_checkpoint=None):
+    parametros = {
+        "tamanho_populacao": TAMANHO_POPULACAO,
+        "max_geracoes": MAX_GERACOES,
+        "taxa_mutacao": TAXA_MUTACAO,
+        "taxa_elitismo": TAXA_ELITISMO,
+        "metodo_selecao": metodo_selecao,
+        "metodo_crossover": metodo_crossover,
+        "metodo_elitismo": metodo_elitismo,
+        "metodo_mutacao": metodo_mutacao,
+        "pmx_retorna_um_filho": pmx_retorna_um_filho
+    }
+
+    # As 5 repetições rodam em paralelo, cada uma com seu próprio fluxo aleatório
+    # Com `pasta_checkpoint`, repetições já concluídas não são executadas de novo
+    resultados = []
+    for resultado in executar_grade(pqc, [parametros], repeticoes=5, semente=semente, processos=processos,
+                                    pasta_checkpoint=pasta_checkpoint):
+        if armazem is not None and not resultado.get("retomado"):
+            registrar_resultado(armazem, experimento, pqc, resultado, semente)
+        resultados.append(resultado)
+    resultados.sort(key=lambda r: r["repeticao"])
+    custos = [r["custo"] for r in resultados]
+    tempos_execucao = [r["tempo"] for r in resultados]
     
     media = statistics.mean(custos)
+    custo_otimo, _ = otimo(pqc, ARQUIVO_OTIMOS)
+    gap = (media - custo_otimo) / custo_otimo
     desvio_padrao = statistics.stdev(custos) if len(custos) > 1 else 0
     tempo_total = sum(tempos_execucao)
     
     config = f"{metodo_selecao}/{metodo_crossover}/{metodo_elitismo}/{metodo_mutacao}"
     print(f"Config: {config}")
-    print(f"Média: {media} | Desvio Padrão: {desvio_padrao} | Tempo Total: {tempo_total:.2f}s\n")
+    print(f"Média: {media} | Desvio Padrão: {desvio_padrao} | Ótimo: {custo_otimo} | Gap médio: {gap:.2%} | Tempo Total: {tempo_total:.2f}s\n")
     
-    return {"config": config, "custo": media, "tempo": f"{statistics.mean(tempos_execucao):.2f}s", "media": media, "desvio_padrao": desvio_padrao, "tempo_total": f"{tempo_total:.2f}s"}
+    return {"config": config, "custo": media, "gap": gap, "tempo": f"{statistics.mean(tempos_execucao):.2f}s", "media": media, "desvio_padrao": desvio_padrao, "tempo_total": f"{tempo_total:.2f}s"}
 
 def main():
     import sys, io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
     pqc = PQA(n=N, seed=SEED)
+    armazem = ArmazemResultados(ARQUIVO_RESULTADOS)
 
     print("\n" + "="*50)
     print("INÍCIO DA EXECUÇÃO - TRABALHO 2 - ALGORITMOS GENÉTICOS")
@@ -155,7 +155,7 @@ def main():
 
     # Parte 0: Escolha de Parâmetros
     print("\n=== PARTE 0: ESCOLHA DE PARÂMETROS ===")
-    melhor_config = testar_parametros()
+    melhor_config = testar_parametros(armazem=armazem)
     print("\n")
     print(f"Melhor configuração encontrada:")
     print(f"População: {melhor_config[0]}, Gerações: {melhor_config[1]}, Mutação: {melhor_config[2]}, Elitismo: {melhor_config[3]}")
@@ -168,33 +168,32 @@ def main():
     # --- PARTE 1: Comparação de Seleção ---
     # print("\n=== PARTE 1: SELEÇÃO (TORNEIO vs ROLETA) ===")
     # resultados_parte1 = []
-    # resultados_parte1.append(executar_experimento(pqc, 'torneio', 'ox', 'top', 'swap'))
-    # resultados_parte1.append(executar_experimento(pqc, 'roleta', 'ox', 'top', 'swap'))
-    # salvar_dados_experimento("parte_1_selecao", "selecao", resultados_parte1)
+    # resultados_parte1.append(executar_experimento(pqc, 'torneio', 'ox', 'top', 'swap', armazem=armazem, experimento="parte_1_selecao"))
+    # resultados_parte1.append(executar_experimento(pqc, 'roleta', 'ox', 'top', 'swap', armazem=armazem, experimento="parte_1_selecao"))
 
     # # --- PARTE 2: Comparação de Crossover ---
     # print("\n=== PARTE 2: CROSSOVER (OX vs PMX) ===")
     # resultados_parte2 = []
-    # resultados_parte2.append(executar_experimento(pqc, 'torneio', 'ox', 'top', 'swap'))
-    # resultados_parte2.append(executar_experimento(pqc, 'torneio', 'pmx', 'top', 'swap', pmx_retorna_um_filho=True))
-    # salvar_dados_experimento("parte_2_crossover", "crossover", resultados_parte2)
+    # resultados_parte2.append(executar_experimento(pqc, 'torneio', 'ox', 'top', 'swap', armazem=armazem, experimento="parte_2_crossover"))
+    # resultados_parte2.append(executar_experimento(pqc, 'torneio', 'pmx', 'top', 'swap', pmx_retorna_um_filho=True, armazem=armazem, experimento="parte_2_crossover"))
 
     # # --- PARTE 3: Comparação de Elitismo ---
     # print("\n=== PARTE 3: ELITISMO (TOP vs HÍBRIDO) ===")
     # resultados_parte3 = []
-    # resultados_parte3.append(executar_experimento(pqc, 'torneio', 'ox', 'top', 'swap'))
-    # resultados_parte3.append(executar_experimento(pqc, 'torneio', 'ox', 'hibrido', 'swap'))
-    # salvar_dados_experimento("parte_3_elitismo", "elitismo", resultados_parte3)
+    # resultados_parte3.append(executar_experimento(pqc, 'torneio', 'ox', 'top', 'swap', armazem=armazem, experimento="parte_3_elitismo"))
+    # resultados_parte3.append(executar_experimento(pqc, 'torneio', 'ox', 'hibrido', 'swap', armazem=armazem, experimento="parte_3_elitismo"))
 
     # #--- PARTE 4: Comparação de Mutação ---
     # print("\n=== PARTE 4: MUTAÇÃO (SWAP vs INVERSÃO) ===")
     # resultados_parte4 = []
-    # resultados_parte4.append(executar_experimento(pqc, 'torneio', 'ox', 'top', 'swap'))
-    # resultados_parte4.append(executar_experimento(pqc, 'torneio', 'ox', 'top', 'inversao'))
-    # salvar_dados_experimento("parte_4_mutacao", "mutacao", resultados_parte4)
+    # resultados_parte4.append(executar_experimento(pqc, 'torneio', 'ox', 'top', 'swap', armazem=armazem, experimento="parte_4_mutacao"))
+    # resultados_parte4.append(executar_experimento(pqc, 'torneio', 'ox', 'top', 'inversao', armazem=armazem, experimento="parte_4_mutacao"))
     
     # print("\n=== PARTE 5: TAMANHO MÁXIMO DE ENTRADA VIÁVEL ===")
     # testar_tamanho_maximo()
 
+    armazem.fechar()
+    print(f"Dados salvos em: {ARQUIVO_RESULTADOS}")
+
 if __name__ == "__main__":
     main()
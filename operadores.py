@@ -1,33 +1,58 @@
+import time
 import numpy as np
-from typing import List
+from typing import List, Tuple
+
+# Ativa a verificação (cara) de que cada filho gerado é uma permutação válida
+VALIDAR_FILHOS = False
+
+# Gerador usado quando nenhum rng é passado aos operadores
+_RNG_PADRAO = np.random.default_rng()
+
+
+def _gerador(rng: np.random.Generator = None) -> np.random.Generator:
+    return _RNG_PADRAO if rng is None else rng
 
 class Selecao:
     @staticmethod
-    def roleta(populacao: List[List[int]], fitness: List[float]) -> List[List[int]]:
-        total_fitness = sum(fitness)
+    def roleta_indices(fitness: np.ndarray, rng: np.random.Generator = None, quantidade: int = None) -> np.ndarray:
+        """`quantidade` sorteios (padrão: um por indivíduo)."""
+        rng = _gerador(rng)
+        fitness = np.asarray(fitness)
+        total_fitness = fitness.sum()
+        quantidade = len(fitness) if quantidade is None else quantidade
 
         # Se todos os fitness forem iguais ou zero, escolhe aleatoriamente
-        if total_fitness == 0 or len(set(fitness)) == 1:
-            return [populacao[i] for i in np.random.choice(len(populacao), size=len(populacao), replace=True)]
+        if total_fitness == 0 or np.all(fitness == fitness[0]):
+            return rng.integers(0, len(fitness), quantidade)
 
         # Normaliza probabilidades
-        probabilidades = [f / total_fitness for f in fitness]
-        indices = np.random.choice(len(populacao), size=len(populacao), p=probabilidades)
-        return [populacao[i] for i in indices]
+        return rng.choice(len(fitness), size=quantidade, p=fitness / total_fitness)
+
+    @staticmethod
+    def roleta(populacao: List[List[int]], fitness: List[float], rng: np.random.Generator = None) -> List[List[int]]:
+        return [populacao[i] for i in Selecao.roleta_indices(fitness, rng)]
 
 
     ##//////////////////////////
 
     @staticmethod
-    def torneio_eficiente(populacao: List[List[int]], fitness: List[float]) -> List[List[int]]:
-        indices = np.random.randint(0, len(populacao), (len(populacao), 3))  # 3 participantes por torneio
-        fitness_participantes = np.array(fitness)[indices]
-        vencedores = indices[np.arange(len(populacao)), np.argmax(fitness_participantes, axis=1)]
-        return [populacao[i] for i in vencedores]
+    def torneio_indices(fitness: np.ndarray, tamanho_torneio: int = 3, rng: np.random.Generator = None,
+                        quantidade: int = None) -> np.ndarray:
+        """Vencedores de `quantidade` torneios (padrão: um por indivíduo)."""
+        fitness = np.asarray(fitness)
+        quantidade = len(fitness) if quantidade is None else quantidade
+        indices = _gerador(rng).integers(0, len(fitness), (quantidade, tamanho_torneio))
+        vencedores = indices[np.arange(quantidade), np.argmax(fitness[indices], axis=1)]
+        return vencedores
+
+    @staticmethod
+    def torneio_eficiente(populacao: List[List[int]], fitness: List[float], rng: np.random.Generator = None,
+                          tamanho_torneio: int = 3) -> List[List[int]]:
+        return [populacao[i] for i in Selecao.torneio_indices(fitness, tamanho_torneio, rng)]
 
 class Crossover:
     @staticmethod
-    def ox(pai1: List[int], pai2: List[int]) -> List[int]:
+    def ox(pai1: List[int], pai2: List[int], rng: np.random.Generator = None) -> List[int]:
         """
         Order Crossover (OX) - Versão robusta para todos os casos.
         Mantém um segmento do pai1 e preenche o restante com a ordem do pai2.
@@ -37,7 +62,7 @@ class Crossover:
             return pai1.copy()
 
         # 1. Seleciona pontos de corte distintos
-        ponto1, ponto2 = sorted(np.random.choice(size, 2, replace=False))
+        ponto1, ponto2 = sorted(_gerador(rng).choice(size, 2, replace=False))
         segmento = pai1[ponto1:ponto2]
 
         # 2. Inicializa o filho com o segmento do pai1
@@ -53,13 +78,13 @@ class Crossover:
                 filho[ptr % size] = gene
                 ptr += 1
 
-        # 4. Validação final
-        if sorted(filho) != list(range(size)):
+        # 4. Validação final (somente em modo de depuração)
+        if VALIDAR_FILHOS and sorted(filho) != list(range(size)):
             raise ValueError(f"OX inválido: {filho}")
         return filho
 
     @staticmethod
-    def pmx(pai1: List[int], pai2: List[int]) -> List[List[int]]:
+    def pmx(pai1: List[int], pai2: List[int], rng: np.random.Generator = None) -> List[List[int]]:
         """
         PMX (Partially Mapped Crossover).  Retorna dois filhos.
         """
@@ -67,7 +92,7 @@ class Crossover:
         assert len(pai1) == len(pai2), "Pais devem ter o mesmo tamanho"
 
         # 1. Escolher dois pontos de corte aleatórios
-        ponto1, ponto2 = sorted(np.random.choice(size, 2, replace=False))
+        ponto1, ponto2 = sorted(_gerador(rng).choice(size, 2, replace=False))
 
         # Função auxiliar para criar um filho a partir dos pais
         def criar_filho(p1, p2):
@@ -96,31 +121,240 @@ class Crossover:
 
         return filho1, filho2
 
+    # ---- Versões em lote: operam sobre a matriz da população inteira ----
+
+    @staticmethod
+    def sortear_pontos(quantidade: int, tamanho: int, rng: np.random.Generator = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Sorteia `quantidade` pares de pontos de corte distintos (ponto1 < ponto2)."""
+        sorteio = _gerador(rng).integers(0, [tamanho, tamanho - 1], (quantidade, 2))
+        a, b = sorteio[:, 0], sorteio[:, 1]
+        b += b >= a  # Garante b != a sem rejeição
+        return np.minimum(a, b), np.maximum(a, b)
+
+    @staticmethod
+    def _validar_lote(filhos: np.ndarray, nome: str):
+        esperado = np.arange(filhos.shape[1])
+        invalidos = np.flatnonzero(np.any(np.sort(filhos, axis=1) != esperado, axis=1))
+        if len(invalidos):
+            raise ValueError(f"{nome} inválido: {filhos[invalidos[0]].tolist()}")
+
+    @staticmethod
+    def _posicoes(pais: np.ndarray) -> np.ndarray:
+        """Permutação inversa de cada linha: posicoes[r, gene] = coluna do gene em pais[r]."""
+        posicoes = np.empty_like(pais)
+        linhas = np.arange(len(pais))[:, None]
+        posicoes[linhas, pais] = np.arange(pais.shape[1], dtype=pais.dtype)
+        return posicoes
+
+    @staticmethod
+    def ox_lote(populacao: np.ndarray, pais1: np.ndarray, pais2: np.ndarray,
+                pontos1: np.ndarray, pontos2: np.ndarray, validar: bool = None) -> np.ndarray:
+        """
+        OX para vários pares de uma vez. pais1/pais2 são índices de linhas de `populacao`
+        e pontos1/pontos2 os cortes de cada par. Retorna a matriz de filhos.
+        """
+        p1, p2 = populacao[pais1], populacao[pais2]
+        n = populacao.shape[1]
+        a, b = pontos1[:, None], pontos2[:, None]
+        colunas = np.arange(n)
+
+        # Genes do pai2 em ordem circular a partir de ponto2
+        rotacao = (b + colunas) % n
+        genes = np.take_along_axis(p2, rotacao, axis=1)
+
+        # Gene pertence ao segmento do pai1 <=> sua posição no pai1 está em [ponto1, ponto2)
+        pos_pai1 = np.take_along_axis(Crossover._posicoes(p1), genes, axis=1)
+        no_segmento = (pos_pai1 >= a) & (pos_pai1 < b)
+        genes = np.take_along_axis(genes, np.argsort(no_segmento, axis=1, kind='stable'), axis=1)
+
+        # As posições livres, em ordem circular a partir de ponto2, são os primeiros n - (b - a) itens da rotação
+        livres = colunas < n - (b - a)
+        filhos = p1.copy()
+        linhas = np.broadcast_to(np.arange(len(p1))[:, None], livres.shape)
+        filhos[linhas[livres], rotacao[livres]] = genes[livres]
+
+        if VALIDAR_FILHOS if validar is None else validar:
+            Crossover._validar_lote(filhos, "OX")
+        return filhos
+
+    @staticmethod
+    def _pmx_filhos(p1: np.ndarray, p2: np.ndarray, segmento: np.ndarray) -> np.ndarray:
+        linhas = np.arange(len(p1))[:, None]
+
+        # mapeamento[r, p1[i]] = p2[i] para i no segmento; identidade fora dele
+        mapeamento = np.broadcast_to(np.arange(p1.shape[1], dtype=p1.dtype), p1.shape).copy()
+        r, c = np.nonzero(segmento)
+        mapeamento[r, p1[r, c]] = p2[r, c]
+
+        pos_pai1 = Crossover._posicoes(p1)
+        gene_no_segmento = np.take_along_axis(segmento, pos_pai1, axis=1)
+
+        # Segue o mapeamento enquanto o gene vindo do pai2 já estiver no segmento do pai1
+        genes = p2.copy()
+        fora = ~segmento
+        while True:
+            conflito = fora & gene_no_segmento[linhas, genes]
+            if not conflito.any():
+                break
+            r, c = np.nonzero(conflito)
+            genes[r, c] = mapeamento[r, genes[r, c]]
+        return np.where(segmento, p1, genes)
+
+    @staticmethod
+    def pmx_lote(populacao: np.ndarray, pais1: np.ndarray, pais2: np.ndarray,
+                 pontos1: np.ndarray, pontos2: np.ndarray,
+                 validar: bool = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        PMX para vários pares de uma vez. Retorna as matrizes (filhos1, filhos2).
+        """
+        p1, p2 = populacao[pais1], populacao[pais2]
+        colunas = np.arange(populacao.shape[1])
+        segmento = (colunas >= pontos1[:, None]) & (colunas < pontos2[:, None])
+
+        filhos1 = Crossover._pmx_filhos(p1, p2, segmento)
+        filhos2 = Crossover._pmx_filhos(p2, p1, segmento)
+
+        if VALIDAR_FILHOS if validar is None else validar:
+            Crossover._validar_lote(filhos1, "PMX")
+            Crossover._validar_lote(filhos2, "PMX")
+        return filhos1, filhos2
+
 
 class Mutacao:
     @staticmethod
-    def swap(individuo: List[int]) -> List[int]:
+    def sortear_posicoes(tamanho: int, rng: np.random.Generator = None) -> Tuple[int, int]:
+        """Sorteia duas posições distintas (i < j) para swap ou inversão."""
+        i, j = sorted(_gerador(rng).choice(tamanho, 2, replace=False))
+        return int(i), int(j)
+
+    @staticmethod
+    def swap(individuo: List[int], rng: np.random.Generator = None) -> List[int]:
         novo_ind = individuo.copy()
-        i, j = np.random.choice(len(individuo), 2, replace=False)
+        i, j = _gerador(rng).choice(len(individuo), 2, replace=False)
         novo_ind[i], novo_ind[j] = novo_ind[j], novo_ind[i]
         return novo_ind
     @staticmethod
-    def inversao(individuo: List[int]) -> List[int]:
-        i, j = sorted(np.random.choice(len(individuo), 2, replace=False))
+    def inversao(individuo: List[int], rng: np.random.Generator = None) -> List[int]:
+        i, j = sorted(_gerador(rng).choice(len(individuo), 2, replace=False))
         return individuo[:i] + list(reversed(individuo[i:j])) + individuo[j:]
 
+    # ---- Versões em lote: alteram a matriz in-place e retornam as posições afetadas ----
+
+    @staticmethod
+    def _sortear_lote(quantidade: int, tamanho: int, taxa_mutacao: float,
+                      rng: np.random.Generator = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Sorteia a máscara de mutação e os pares (i < j) de todas as linhas com uma única chamada ao RNG."""
+        sorteio = _gerador(rng).random((quantidade, 3))
+        linhas = np.flatnonzero(sorteio[:, 0] < taxa_mutacao)
+        a = (sorteio[linhas, 1] * tamanho).astype(np.intp)
+        b = (sorteio[linhas, 2] * (tamanho - 1)).astype(np.intp)
+        b += b >= a  # Garante b != a sem rejeição
+        return linhas, np.minimum(a, b), np.maximum(a, b)
+
+    @staticmethod
+    def swap_lote(populacao: np.ndarray, taxa_mutacao: float,
+                  rng: np.random.Generator = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Troca os genes i e j de cada linha sorteada (com probabilidade taxa_mutacao).
+        Retorna (linhas, i, j) das mutações aplicadas.
+        """
+        linhas, i, j = Mutacao._sortear_lote(len(populacao), populacao.shape[1], taxa_mutacao, rng)
+        populacao[linhas, i], populacao[linhas, j] = populacao[linhas, j], populacao[linhas, i]
+        return linhas, i, j
+
+    @staticmethod
+    def inversao_lote(populacao: np.ndarray, taxa_mutacao: float,
+                      rng: np.random.Generator = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Inverte o segmento [i, j) de cada linha sorteada (com probabilidade taxa_mutacao).
+        Retorna (linhas, i, j) das mutações aplicadas.
+        """
+        linhas, i, j = Mutacao._sortear_lote(len(populacao), populacao.shape[1], taxa_mutacao, rng)
+        colunas = np.arange(populacao.shape[1])
+        no_segmento = (colunas >= i[:, None]) & (colunas < j[:, None])
+        origem = np.where(no_segmento, (i + j - 1)[:, None] - colunas, colunas)
+        populacao[linhas] = np.take_along_axis(populacao[linhas], origem, axis=1)
+        return linhas, i, j
+
+
+class BuscaLocal:
+    """
+    Busca local por troca de pares (2-exchange) usada no modo memético. Os custos são
+    atualizados apenas por deltas, nunca recalculados do zero. `pqc` é a instância do PQA.
+    Retornam (individuo melhorado, custo, número de trocas aplicadas).
+    """
+
+    @staticmethod
+    def melhor_melhoria(pqc, individuo: np.ndarray, custo: int, max_iteracoes: int = 50,
+                        tempo_limite: float = None) -> Tuple[np.ndarray, int, int]:
+        """
+        A cada iteração aplica a troca de maior redução de custo, até um ótimo local ou o limite.
+        A matriz de deltas é calculada uma vez e atualizada em O(n²) após cada troca.
+        """
+        individuo = np.array(individuo)
+        inicio = time.perf_counter()
+        trocas = 0
+        delta = pqc.matriz_delta_swap(individuo)
+        while trocas < max_iteracoes:
+            r, s = np.unravel_index(np.argmin(delta), delta.shape)
+            if delta[r, s] >= 0:
+                break
+            individuo[r], individuo[s] = individuo[s], individuo[r]
+            custo += int(delta[r, s])
+            trocas += 1
+            pqc.atualizar_delta_swap(delta, individuo, r, s)
+            if tempo_limite is not None and time.perf_counter() - inicio >= tempo_limite:
+                break
+        return individuo, custo, trocas
+
+    @staticmethod
+    def primeira_melhoria(pqc, individuo: np.ndarray, custo: int, max_iteracoes: int = 50,
+                          tempo_limite: float = None, rng: np.random.Generator = None) -> Tuple[np.ndarray, int, int]:
+        """
+        Percorre as posições r em ordem aleatória e aplica a primeira troca (r, s) que reduz o
+        custo. Os deltas de r contra todos os s são calculados juntos, O(n) por par.
+        """
+        individuo = np.array(individuo)
+        n = len(individuo)
+        inicio = time.perf_counter()
+        trocas = 0
+        melhorou = True
+        while melhorou and trocas < max_iteracoes:
+            melhorou = False
+            for r in _gerador(rng).permutation(n):
+                outros = np.delete(np.arange(n), r)
+                deltas = pqc.delta_swap_lote(np.broadcast_to(individuo, (n - 1, n)), np.full(n - 1, r), outros)
+                melhores = np.flatnonzero(deltas < 0)
+                if len(melhores):
+                    s = outros[melhores[0]]
+                    individuo[r], individuo[s] = individuo[s], individuo[r]
+                    custo += int(deltas[melhores[0]])
+                    trocas += 1
+                    melhorou = True
+                    break
+            if tempo_limite is not None and time.perf_counter() - inicio >= tempo_limite:
+                break
+        return individuo, custo, trocas
+
 
 # operadores.py (classe Elitismo corrigida)
 class Elitismo:
+    @staticmethod
+    def indices_melhores(fitness: List[float], n_elites: int) -> np.ndarray:
+        return np.argsort(fitness)[::-1][:n_elites]  # Ordena em ordem decrescente de fitness
+
+    @staticmethod
+    def indices_melhores_e_aleatorios(fitness: List[float], n_elites: int, n_aleatorios: int,
+                                      rng: np.random.Generator = None) -> np.ndarray:
+        aleatorios = _gerador(rng).choice(len(fitness), n_aleatorios, replace=False)
+        return np.concatenate((Elitismo.indices_melhores(fitness, n_elites), aleatorios))
+
     @staticmethod
     def manter_melhores(populacao: List[List[int]], fitness: List[float], n_elites: int) -> List[List[int]]:
-        indices_ordenados = np.argsort(fitness)[::-1]  # Ordena em ordem decrescente de fitness
-        return [populacao[i] for i in indices_ordenados[:n_elites]]
+        return [populacao[i] for i in Elitismo.indices_melhores(fitness, n_elites)]
 
     @staticmethod
     def manter_melhores_e_aleatorios(populacao: List[List[int]], fitness: List[float], 
-                                    n_elites: int, n_aleatorios: int) -> List[List[int]]:
-        indices_ordenados = np.argsort(fitness)[::-1]
-        elites = [populacao[i] for i in indices_ordenados[:n_elites]]
-        aleatorios = [populacao[i] for i in np.random.choice(len(populacao), n_aleatorios, replace=False)]
-        return elites + aleatorios
\ No newline at end of file
+                                    n_elites: int, n_aleatorios: int, rng: np.random.Generator = None) -> List[List[int]]:
+        indices = Elitismo.indices_melhores_e_aleatorios(fitness, n_elites, n_aleatorios, rng)
+        return [populacao[i] for i in indices]
\ No newline at end of file
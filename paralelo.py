@@ -0,0 +1,97 @@
+# paralelo.py
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List
+from pqa import PQA
+from algoritmo_genetico import AlgoritmoGenetico
+from checkpoint import Diario
+from exato import chave_instancia
+
+# Instância do PQA compartilhada por todas as tarefas de um processo trabalhador
+_pqc_trabalhador = None
+
+
+def _inicializar_trabalhador(pqc: PQA):
+    global _pqc_trabalhador
+    _pqc_trabalhador = pqc
+
+
+def _executar_tarefa(indice: int, repeticao: int, parametros: Dict, semente: np.random.SeedSequence,
+                     caminho_checkpoint: str = None) -> Dict:
+    """
+    Executa uma repetição de uma configuração do AG com seu próprio fluxo aleatório. Retomada de
+    um checkpoint, o traço e o tempo cobrem a execução inteira, não só o trecho após a retomada.
+    """
+    inicio = time.time()
+    parametros_execucao = {"intervalo_impressao": 0, **parametros}  # Sem saída no console por padrão
+    if caminho_checkpoint is not None:
+        parametros_execucao["caminho_checkpoint"] = caminho_checkpoint
+    ag = AlgoritmoGenetico(pqc=_pqc_trabalhador, rng=np.random.default_rng(semente), **parametros_execucao)
+    solucao = ag.executar()
+    tempo_execucao = time.time() - inicio + ag.tempo_retomado
+
+    return {
+        "indice": indice,
+        "repeticao": repeticao,
+        "parametros": parametros,
+        "solucao": solucao,
+        "custo": _pqc_trabalhador.calcular_custo(solucao),
+        "tempo": tempo_execucao,
+        "traco": np.array(ag.traco, dtype=np.int64),
+    }
+
+
+def executar_grade(pqc: PQA, configuracoes: List[Dict], repeticoes: int = 1,
+                   semente: int = None, processos: int = None, pasta_checkpoint: str = None) -> Iterator[Dict]:
+    """
+    Distribui as tarefas (configuração, repetição) entre todos os núcleos e devolve
+    os resultados à medida que terminam (a ordem não é garantida; use "indice" e
+    "repeticao" para identificá-los).
+
+    Cada tarefa recebe uma SeedSequence filha de `semente`, então o resultado de uma
+    tarefa não depende de quantos processos existem nem da ordem de execução.
+
+    Com `pasta_checkpoint` a grade pode ser retomada: cada tarefa concluída é anotada em um
+    diário e cada execução do AG grava checkpoints periódicos na pasta. Chamar de novo com a
+    mesma grade, semente e instância devolve primeiro as tarefas já concluídas, sem executá-las
+    (com "retomado": True), e as interrompidas continuam do último checkpoint. Entradas do diário
+    e checkpoints de outra semente ou instância são ignorados.
+    """
+    sementes = np.random.SeedSequence(semente).spawn(len(configuracoes) * repeticoes)
+    instancia = chave_instancia(pqc) if pasta_checkpoint else None
+
+    diario = Diario(os.path.join(pasta_checkpoint, "diario.jsonl")) if pasta_checkpoint else None
+    concluidas = set()
+    if diario is not None:
+        for resultado in diario.concluidas():
+            # Entradas de outra grade (parâmetros, semente ou instância diferentes) são ignoradas
+            if resultado["indice"] < len(configuracoes) and resultado["parametros"] == configuracoes[resultado["indice"]] \
+                    and resultado.get("semente") == semente and resultado.get("instancia") == instancia:
+                concluidas.add((resultado["indice"], resultado["repeticao"]))
+                yield {**resultado, "traco": np.array(resultado["traco"], dtype=np.int64), "retomado": True}
+
+    with ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_trabalhador,
+                             initargs=(pqc,)) as executor:
+        futuros = [
+            executor.submit(_executar_tarefa, indice, repeticao, parametros,
+                            sementes[indice * repeticoes + repeticao],
+                            os.path.join(pasta_checkpoint, f"tarefa_{indice}_{repeticao}.npz") if pasta_checkpoint else None)
+            for indice, parametros in enumerate(configuracoes)
+            for repeticao in range(repeticoes)
+            if (indice, repeticao) not in concluidas
+        ]
+        try:
+            for futuro in as_completed(futuros):
+                resultado = futuro.result()
+                yield resultado
+                # Anotado só depois que o consumidor processou o resultado (ex.: gravou no armazém):
+                # uma interrupção entre os dois repete a tarefa em vez de perdê-la
+                if diario is not None:
+                    diario.registrar({**resultado, "traco": resultado["traco"].tolist(),
+                                      "semente": semente, "instancia": instancia})
+        finally:
+            # Se o consumidor parar antes (break, exceção, Ctrl-C), as tarefas que ainda não começaram
+            # são canceladas; sem isso a saída do `with` esperaria a grade inteira terminar
+            executor.shutdown(cancel_futures=True)
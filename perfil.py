@@ -0,0 +1,50 @@
+# perfil.py
+import time
+from typing import Dict
+
+# Fases de uma geração, na ordem em que ocorrem em AlgoritmoGenetico.proxima_geracao
+# ("substituicao" é exclusiva do passo estacionário)
+FASES = ("adaptacao", "selecao", "elitismo", "crossover", "mutacao", "reposicao", "unicidade", "avaliacao", "busca_local",
+         "substituicao", "fitness", "registro")
+
+
+class Perfil:
+    """
+    Tempo de relógio e número de chamadas acumulados por fase do AG.
+
+    Funciona como um cronômetro de voltas: `iniciar` marca o instante atual e cada `marcar(fase)`
+    atribui à fase o tempo desde a marca anterior. Custa uma chamada a perf_counter por fase.
+    """
+
+    def __init__(self):
+        self.tempos = dict.fromkeys(FASES, 0.0)
+        self.chamadas = dict.fromkeys(FASES, 0)
+        self._marca = time.perf_counter()
+
+    def iniciar(self):
+        self._marca = time.perf_counter()
+
+    def marcar(self, fase: str):
+        agora = time.perf_counter()
+        self.tempos[fase] += agora - self._marca
+        self.chamadas[fase] += 1
+        self._marca = agora
+
+    @property
+    def tempo_total(self) -> float:
+        return sum(self.tempos.values())
+
+    def resumo(self) -> Dict[str, Dict]:
+        """{fase: {"tempo", "chamadas", "fracao"}} apenas das fases executadas."""
+        total = self.tempo_total or 1.0
+        return {
+            fase: {"tempo": self.tempos[fase], "chamadas": self.chamadas[fase], "fracao": self.tempos[fase] / total}
+            for fase in FASES if self.chamadas[fase]
+        }
+
+    def __str__(self) -> str:
+        linhas = [f"{'Fase':12s} {'Tempo (s)':>10s} {'Chamadas':>9s} {'%':>6s}"]
+        for fase, dados in sorted(self.resumo().items(), key=lambda item: -item[1]["tempo"]):
+            linhas.append(f"{fase:12s} {dados['tempo']:10.4f} {dados['chamadas']:9d} {100 * dados['fracao']:6.1f}")
+        return "\n".join(linhas)
+
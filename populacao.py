@@ -0,0 +1,60 @@
+# populacao.py
+import numpy as np
+from typing import Tuple
+
+
+def dtype_permutacao(n: int) -> np.dtype:
+    """Menor tipo inteiro capaz de representar os genes 0..n-1."""
+    return np.dtype(np.int16) if n <= np.iinfo(np.int16).max else np.dtype(np.int32)
+
+
+class Populacao:
+    """
+    População armazenada como uma matriz contígua (tamanho x n) com vetores
+    paralelos de custo e fitness. Mantém dois buffers: a próxima geração é
+    escrita no buffer de trás e `trocar` apenas alterna os dois, sem alocar.
+    """
+
+    def __init__(self, tamanho: int, n: int):
+        self.tamanho = tamanho
+        self.n = n
+        dtype = dtype_permutacao(n)
+        self._individuos = [np.empty((tamanho, n), dtype=dtype) for _ in range(2)]
+        self._custos = [np.empty(tamanho, dtype=np.int64) for _ in range(2)]
+        self._fitness = np.empty(tamanho, dtype=np.float64)
+        self._atual = 0
+
+    @property
+    def individuos(self) -> np.ndarray:
+        return self._individuos[self._atual]
+
+    @property
+    def custos(self) -> np.ndarray:
+        return self._custos[self._atual]
+
+    @property
+    def fitness(self) -> np.ndarray:
+        return self._fitness
+
+    def proxima(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Buffers (indivíduos, custos) onde a próxima geração deve ser escrita."""
+        return self._individuos[1 - self._atual], self._custos[1 - self._atual]
+
+    def atualizar_fitness(self):
+        np.add(self.custos, 1, out=self._fitness)
+        np.reciprocal(self._fitness, out=self._fitness)
+
+    def substituir(self, linha: int, individuo: np.ndarray, custo: int):
+        """Troca um único indivíduo da geração atual (modo estacionário), mantendo o fitness em dia."""
+        self.individuos[linha] = individuo
+        self.custos[linha] = custo
+        self._fitness[linha] = 1 / (1 + custo)
+
+    def trocar(self):
+        """Promove o buffer de trás a geração atual."""
+        self._atual = 1 - self._atual
+        self.atualizar_fitness()
+
+    def gerar_aleatorios(self, destino: np.ndarray, rng: np.random.Generator):
+        """Preenche as linhas de `destino` com permutações aleatórias."""
+        destino[:] = rng.permuted(np.broadcast_to(np.arange(self.n, dtype=destino.dtype), destino.shape), axis=1)
@@ -1,24 +1,116 @@
 import numpy as np
 from typing import List, Tuple
+from populacao import dtype_permutacao
+from atribuicao import resolver_atribuicao
+
+# Memória máxima (em bytes) do tensor temporário usado por calcular_custos
+MEMORIA_BLOCO_PADRAO = 64 * 1024 * 1024
+
+# A partir deste n, calcular_custos permuta cada indivíduo em dois passos (linhas, depois colunas):
+# a indexação 3-D do lote inteiro é mais rápida para n pequeno (10x em n=10), empata em n=50 e
+# fica 2,7x mais lenta em n=200 (pop=500)
+N_MINIMO_POR_LINHA = 50
+
+TIPOS_INTEIROS = (np.int8, np.int16, np.int32, np.int64)
+
+
+def dtype_inteiro(minimo, maximo) -> np.dtype:
+    """Menor tipo inteiro com sinal capaz de representar o intervalo [minimo, maximo]."""
+    for tipo in TIPOS_INTEIROS:
+        info = np.iinfo(tipo)
+        if info.min <= minimo and maximo <= info.max:
+            return np.dtype(tipo)
+    raise OverflowError(f"Intervalo [{minimo}, {maximo}] não cabe em int64")
+
+
+def compactar_matriz(matriz: np.ndarray) -> np.ndarray:
+    """Converte a matriz para o menor tipo inteiro exato; matrizes não inteiras ficam como estão."""
+    if np.issubdtype(matriz.dtype, np.floating) and not np.all(np.mod(matriz, 1) == 0):
+        return matriz
+    tipo = dtype_inteiro(int(matriz.min()), int(matriz.max())) if matriz.size else np.dtype(np.int8)
+    return matriz.astype(tipo, copy=False)
 
 
 class PQA:
-    def __init__(self, n: int, seed: int = None):
+    def __init__(self, n: int, seed=None):
+        """`seed` pode ser um inteiro, uma SeedSequence ou um numpy.random.Generator."""
         self.n = n
-        if seed is not None:
-            np.random.seed(seed)
+        self.rng = np.random.default_rng(seed)  # Gerador próprio: não altera o estado global do NumPy
         self.distancias, self.fluxo = self._gerar_entradas_aleatorias()
+        self._compactar()
         self.fluxo_triangular = np.triu(self.fluxo, k=1)  # Pré-calcula o fluxo não repetido para evita q repita dados simetricos
+        self.derivados = {}  # Arrays derivados das matrizes (ex.: linhas ordenadas para limitantes)
+        self.caminho = None  # Diretório da instância quando carregada do disco (veja instancias.py)
+        self._limitante = None
+
+    @classmethod
+    def de_matrizes(cls, distancias, fluxo, fluxo_triangular=None, derivados=None, caminho: str = None,
+                    compactar: bool = False) -> "PQA":
+        """
+        Cria a instância a partir de matrizes já existentes, sem copiá-las (np.asarray):
+        arrays mapeados em memória continuam mapeados. Com `compactar`, as matrizes são
+        convertidas para o menor tipo inteiro exato (o que gera cópias).
+        """
+        pqc = cls.__new__(cls)
+        pqc.distancias = np.asarray(distancias)
+        pqc.fluxo = np.asarray(fluxo)
+        if pqc.distancias.ndim != 2 or pqc.distancias.shape != pqc.fluxo.shape or \
+                pqc.distancias.shape[0] != pqc.distancias.shape[1]:
+            raise ValueError(f"Matrizes devem ser quadradas e do mesmo tamanho: {pqc.distancias.shape}, {pqc.fluxo.shape}")
+        pqc.n = pqc.distancias.shape[0]
+        pqc.rng = np.random.default_rng()
+        if compactar:
+            pqc._compactar()
+        else:
+            pqc._definir_tipos_acumulacao()
+        pqc.fluxo_triangular = np.triu(pqc.fluxo, k=1) if fluxo_triangular is None else np.asarray(fluxo_triangular)
+        pqc.derivados = derivados or {}
+        pqc.caminho = caminho
+        pqc._limitante = None
+        return pqc
+
+    def __reduce_ex__(self, protocolo):
+        # Instâncias do disco são reabertas pelo caminho (mmap) em vez de copiadas para outro processo
+        if self.caminho is not None:
+            from instancias import carregar_instancia
+            return carregar_instancia, (self.caminho,)
+        return super().__reduce_ex__(protocolo)
+
+    def _compactar(self):
+        """Armazena as matrizes no menor tipo inteiro exato (int8/int16 para as instâncias aleatórias)."""
+        self.distancias = compactar_matriz(self.distancias)
+        self.fluxo = compactar_matriz(self.fluxo)
+        self._definir_tipos_acumulacao()
+
+    def _definir_tipos_acumulacao(self):
+        """
+        Tipos usados no cálculo do custo: `dtype_produto` é o menor tipo que comporta qualquer
+        produto fluxo x distância (o tensor bloco x n x n fica compacto), e as somas são sempre
+        acumuladas em `dtype_soma` (int64), sem risco de overflow.
+        """
+        if not (np.issubdtype(self.distancias.dtype, np.integer) and np.issubdtype(self.fluxo.dtype, np.integer)):
+            self.dtype_produto = self.dtype_soma = np.dtype(np.float64)
+            return
+        extremos_f = (int(self.fluxo.min()), int(self.fluxo.max()))
+        extremos_d = (int(self.distancias.min()), int(self.distancias.max()))
+        produtos = [f * d for f in extremos_f for d in extremos_d]
+        self.dtype_produto = dtype_inteiro(min(produtos), max(produtos))
+        self.dtype_soma = np.dtype(np.int64)
+
+    def _produto_somado(self, dist_perm: np.ndarray, eixos=None):
+        """Soma de fluxo * dist_perm sobre `eixos`: produto no tipo compacto, acumulação em int64."""
+        produto = np.multiply(self.fluxo, dist_perm, dtype=self.dtype_produto)
+        return np.sum(produto, axis=eixos, dtype=self.dtype_soma)
 
 
     def _gerar_entradas_aleatorias(self) -> Tuple[np.ndarray, np.ndarray]:
-        coordenadas = np.random.randint(0, 31, (self.n, 2))
+        coordenadas = self.rng.integers(0, 31, (self.n, 2))
         distancias = np.sqrt(np.sum((coordenadas[:, None, :] - coordenadas[None, :, :]) ** 2, axis=2))
         distancias = distancias = (distancias + distancias.T) // 2
         np.fill_diagonal(distancias, 0)
 
 
-        fluxo = np.random.randint(0, 2*self.n + 1, (self.n, self.n))
+        fluxo = self.rng.integers(0, 2*self.n + 1, (self.n, self.n))
         fluxo = (fluxo + fluxo.T) // 2
         np.fill_diagonal(fluxo, 0)
 
@@ -35,11 +127,132 @@ class PQA:
 
     # pqa.py (trecho corrigido)
     def calcular_custo(self, permutacao: List[int]) -> int:
-        perm = np.array(permutacao)
+        perm = np.asarray(permutacao, dtype=dtype_permutacao(self.n))
         dist_perm = self.distancias[perm, :][:, perm]
-        return int(np.sum(self.fluxo * dist_perm) // 2)  # Forçar retorno como int
-    
+        return int(self._produto_somado(dist_perm) // 2)  # Forçar retorno como int
+
+    def calcular_custos(self, populacao, tamanho_bloco: int = None) -> np.ndarray:
+        """
+        Calcula o custo de toda a população (matriz pop x n). Para n < N_MINIMO_POR_LINHA, em uma
+        única passada vetorizada, com as linhas processadas em blocos para limitar a memória do
+        tensor (bloco x n x n); acima, indivíduo a indivíduo, como calcular_custo.
+        """
+        populacao = np.asarray(populacao)
+        if populacao.ndim != 2 or populacao.shape[1] != self.n:
+            raise ValueError(f"População deve ter formato (pop, {self.n}), recebido: {populacao.shape}")
+
+        if tamanho_bloco is None:
+            # Por indivíduo: o bloco de distâncias permutadas e o produto com o fluxo
+            bytes_por_individuo = self.n * self.n * (self.distancias.itemsize + self.dtype_produto.itemsize)
+            tamanho_bloco = max(1, MEMORIA_BLOCO_PADRAO // bytes_por_individuo)
+
+        custos = np.empty(len(populacao), dtype=np.int64)
+        if self.n >= N_MINIMO_POR_LINHA:
+            for k, perm in enumerate(populacao):
+                custos[k] = self._produto_somado(self.distancias[perm, :][:, perm]) // 2
+            return custos
+        for inicio in range(0, len(populacao), tamanho_bloco):
+            bloco = populacao[inicio:inicio + tamanho_bloco]
+            dist_perm = self.distancias[bloco[:, :, None], bloco[:, None, :]]
+            custos[inicio:inicio + len(bloco)] = self._produto_somado(dist_perm, eixos=(1, 2)) // 2
+        return custos
+
+    def delta_swap(self, permutacao, i: int, j: int) -> int:
+        """
+        Variação do custo ao trocar as posições i e j da permutação, em O(n).
+        Só as linhas/colunas i e j do produto fluxo x distância mudam.
+        """
+        perm = np.asarray(permutacao)
+        if i == j:
+            return 0
+        soma = self.dtype_soma
+        pi, pj = perm[i], perm[j]
+        # Diferenças calculadas em int64: as matrizes compactas (int8/int16) transbordariam
+        variacao = np.sum((self.fluxo[i].astype(soma) - self.fluxo[j]) *
+                          (self.distancias[pj, perm].astype(soma) - self.distancias[pi, perm]))
+        # Os termos k = i e k = j da soma acima valem -2 * f_ij * d_ij e não deveriam entrar
+        return int(variacao + 2 * soma.type(self.fluxo[i, j]) * self.distancias[pi, pj])
+
+    def delta_swap_lote(self, permutacoes: np.ndarray, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """Versão vetorizada de delta_swap: uma troca (i[k], j[k]) por linha de `permutacoes`."""
+        permutacoes = np.asarray(permutacoes)
+        soma = self.dtype_soma
+        linhas = np.arange(len(permutacoes))
+        pi, pj = permutacoes[linhas, i], permutacoes[linhas, j]
+        variacao = np.sum((self.fluxo[i].astype(soma) - self.fluxo[j]) *
+                          (self.distancias[pj[:, None], permutacoes].astype(soma) - self.distancias[pi[:, None], permutacoes]),
+                          axis=1)
+        return (variacao + 2 * self.fluxo[i, j].astype(soma) * self.distancias[pi, pj]).astype(np.int64)
+
+    def matriz_delta_swap(self, permutacao) -> np.ndarray:
+        """
+        Matriz (n x n) com o delta de todas as trocas (r, s) da permutação, em uma única
+        multiplicação de matrizes: delta = M + M.T - diag(M)[:, None] - diag(M)[None, :] + 2 F * Dp,
+        com Dp = D[p][:, p] e M = F @ Dp.
+        Calculada em float64 (BLAS; exata para inteiros abaixo de 2**53) em vez do tipo compacto.
+        """
+        perm = np.asarray(permutacao)
+        dist_perm = self.distancias[perm[:, None], perm[None, :]].astype(np.float64)
+        fluxo = self.fluxo.astype(np.float64)
+        m = fluxo @ dist_perm
+        diagonal = np.diag(m)
+        delta = m + m.T - diagonal[:, None] - diagonal[None, :] + 2 * fluxo * dist_perm
+        return np.rint(delta).astype(np.int64)
+
+    def atualizar_delta_swap(self, delta: np.ndarray, permutacao: np.ndarray, r: int, s: int):
+        """
+        Atualiza in-place a matriz de matriz_delta_swap para `permutacao`, já com a troca (r, s)
+        aplicada, em O(n²) em vez de recalculá-la em O(n³).
+        """
+        perm = np.asarray(permutacao)
+        fluxo = self.fluxo
+        # Em int64: os produtos externos transbordariam nos tipos compactos das matrizes
+        a = fluxo[r].astype(self.dtype_soma) - fluxo[s]
+        b = self.distancias[perm[s], perm].astype(self.dtype_soma) - self.distancias[perm[r], perm]
+        variacao = np.subtract.outer(a, a)
+        variacao *= np.subtract.outer(b, b)
+        delta += variacao  # Exato, sem passar por float
+
+        # Linhas/colunas r e s: recalculadas pela fórmula de matriz_delta_swap restrita a elas,
+        # com produtos matriz-vetor (O(n²)) em inteiros no lugar do produto de matrizes
+        dist_perm = self.distancias[perm[:, None], perm[None, :]].astype(self.dtype_soma)
+        diagonal = np.einsum('ij,ij->i', fluxo, dist_perm)
+        for linha in (r, s):
+            valores = fluxo[linha] @ dist_perm + fluxo @ dist_perm[linha] - diagonal[linha] - diagonal \
+                + 2 * dist_perm[linha] * fluxo[linha]  # dist_perm primeiro: 2 * fluxo transbordaria em int8
+            delta[linha, :] = valores
+            delta[:, linha] = valores
+
+    def _linhas_ordenadas(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Linhas sem a diagonal: fluxo crescente e distâncias decrescentes (de `derivados` se gravadas)."""
+        if "fluxo_ordenado" in self.derivados and "distancias_ordenadas" in self.derivados:
+            return self.derivados["fluxo_ordenado"], self.derivados["distancias_ordenadas"]
+        fora_diagonal = ~np.eye(self.n, dtype=bool)
+        fluxo = self.fluxo[fora_diagonal].reshape(self.n, self.n - 1)
+        distancias = self.distancias[fora_diagonal].reshape(self.n, self.n - 1)
+        return np.sort(fluxo, axis=1), -np.sort(-distancias, axis=1)
+
+    def limitante_gilmore_lawler(self) -> int:
+        """
+        Limitante inferior de Gilmore-Lawler para o custo ótimo (calculado uma vez por instância).
+        Alocar a instalação i no local k custa ao menos o produto escalar do fluxo da linha i
+        (crescente) com as distâncias da linha k (decrescente), o menor pareamento possível;
+        a matriz com todos esses produtos sai de uma única multiplicação de matrizes e a melhor
+        atribuição instalação -> local sobre ela limita a soma completa, que é o dobro do custo.
+        """
+        if self._limitante is None:
+            fluxo_ordenado, distancias_ordenadas = self._linhas_ordenadas()
+            # float64 pelo BLAS, exato para inteiros abaixo de 2**53 (como em matriz_delta_swap)
+            produtos = np.asarray(fluxo_ordenado, dtype=np.float64) @ np.asarray(distancias_ordenadas, dtype=np.float64).T
+            _, soma_minima = resolver_atribuicao(np.rint(produtos).astype(np.int64))
+            self._limitante = int(-(-soma_minima // 2))  # Arredonda para cima: o custo é inteiro
+        return self._limitante
+
     def carregar_matrizes(self, distancias, fluxo):
         self.distancias = np.array(distancias)
         self.fluxo = np.array(fluxo)
+        self._compactar()
         self.fluxo_triangular = np.triu(self.fluxo, k=1)
+        self.derivados = {}
+        self.caminho = None
+        self._limitante = None
@@ -0,0 +1,124 @@
+# telemetria.py
+import csv
+import json
+import numpy as np
+
+# Um registro por geração
+DTYPE_REGISTRO = np.dtype([
+    ("geracao", np.int32),
+    ("melhor", np.int64),
+    ("media", np.float64),
+    ("pior", np.int64),
+    ("diversidade", np.float64),
+    ("avaliacoes", np.int64),
+    ("tempo", np.float64),
+    ("gap", np.float64),  # Gap de otimalidade; NaN sem o limitante (veja AlgoritmoGenetico)
+])
+CAMPOS = DTYPE_REGISTRO.names
+
+
+def diversidade(populacao: np.ndarray, referencia: np.ndarray) -> float:
+    """
+    Distância de Hamming média (normalizada em [0, 1]) entre a população e um indivíduo de
+    referência, em geral o melhor. Custa O(pop * n): barata o bastante para toda geração.
+    """
+    return float(np.mean(populacao != referencia))
+
+
+class Telemetria:
+    """
+    Interface dos destinos de telemetria. O AG chama `registrar` uma vez por geração com uma
+    tupla no formato de DTYPE_REGISTRO e `descarregar` ao final de `executar`. O mesmo destino
+    pode ser compartilhado entre execuções; `fechar` fica a cargo de quem o criou.
+    Com o perfil ativado, o AG também chama `registrar_perfil` uma vez ao final da execução.
+    """
+
+    def registrar(self, registro: tuple):
+        raise NotImplementedError
+
+    def registrar_perfil(self, resumo: dict):
+        """Recebe Perfil.resumo() da execução; ignorado por padrão."""
+
+    def descarregar(self):
+        pass
+
+    def fechar(self):
+        self.descarregar()
+
+
+class TelemetriaMemoria(Telemetria):
+    """Buffer circular em memória com os últimos `capacidade` registros."""
+
+    def __init__(self, capacidade: int = 10000):
+        self._dados = np.zeros(capacidade, dtype=DTYPE_REGISTRO)
+        self._total = 0
+        self.perfis = []  # Um resumo de perfil por execução
+
+    def registrar(self, registro: tuple):
+        self._dados[self._total % len(self._dados)] = registro
+        self._total += 1
+
+    def registrar_perfil(self, resumo: dict):
+        self.perfis.append(resumo)
+
+    def registros(self) -> np.ndarray:
+        """Registros retidos, do mais antigo para o mais recente."""
+        if self._total <= len(self._dados):
+            return self._dados[:self._total].copy()
+        inicio = self._total % len(self._dados)
+        return np.concatenate((self._dados[inicio:], self._dados[:inicio]))
+
+
+class _TelemetriaArquivo(Telemetria):
+    """Base dos destinos em arquivo: acumula `tamanho_buffer` registros antes de escrever."""
+
+    def __init__(self, caminho: str, tamanho_buffer: int = 256):
+        self.caminho = caminho
+        self._buffer = np.zeros(tamanho_buffer, dtype=DTYPE_REGISTRO)
+        self._pendentes = 0
+
+    def registrar(self, registro: tuple):
+        self._buffer[self._pendentes] = registro
+        self._pendentes += 1
+        if self._pendentes == len(self._buffer):
+            self.descarregar()
+
+    def descarregar(self):
+        if self._pendentes:
+            self._escrever(self._buffer[:self._pendentes])
+            self._pendentes = 0
+
+    def _escrever(self, registros: np.ndarray):
+        raise NotImplementedError
+
+    def registrar_perfil(self, resumo: dict):
+        # Perfis vão para um arquivo ao lado, uma linha JSON por execução
+        with open(self.caminho + ".perfil.jsonl", mode="a", encoding='utf-8') as arquivo:
+            arquivo.write(json.dumps(resumo) + "\n")
+
+
+class TelemetriaCSV(_TelemetriaArquivo):
+    def __init__(self, caminho: str, tamanho_buffer: int = 256):
+        super().__init__(caminho, tamanho_buffer)
+        with open(caminho, mode="w", newline="", encoding='utf-8') as arquivo_csv:
+            csv.writer(arquivo_csv).writerow(CAMPOS)
+
+    def _escrever(self, registros: np.ndarray):
+        with open(self.caminho, mode="a", newline="", encoding='utf-8') as arquivo_csv:
+            csv.writer(arquivo_csv).writerows(registros.tolist())
+
+
+class TelemetriaBinaria(_TelemetriaArquivo):
+    """Registros gravados em formato binário bruto (DTYPE_REGISTRO); leia com `ler`."""
+
+    def __init__(self, caminho: str, tamanho_buffer: int = 256):
+        super().__init__(caminho, tamanho_buffer)
+        open(caminho, "wb").close()
+
+    def _escrever(self, registros: np.ndarray):
+        with open(self.caminho, "ab") as arquivo:
+            registros.tofile(arquivo)
+
+    @staticmethod
+    def ler(caminho: str) -> np.ndarray:
+        return np.fromfile(caminho, dtype=DTYPE_REGISTRO)